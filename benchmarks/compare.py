@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and report regressions.
+
+A result regresses when its warm throughput drops, or its peak RSS grows, by more
+than the threshold. The exit status is 1 if any result regressed.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.1
+
+
+def _key(entry):
+    return entry["mode"], entry["rows"], entry["width"], tuple(entry["types"])
+
+
+def _throughput(entry):
+    run = entry.get("warm_median") or entry.get("cold")
+    return run["rows_per_second"] if run else None
+
+
+def compare(baseline, candidate, threshold=DEFAULT_THRESHOLD):
+    """
+    Match the results of two reports and compute the change of each one.
+
+    Args:
+        baseline (dict): Report of the reference version.
+        candidate (dict): Report of the version under test.
+        threshold (float): Relative change beyond which a result is a regression.
+
+    Returns:
+        list: One dict per result present in both reports, with the throughput and peak
+            RSS ratios of candidate over baseline and a regression flag.
+    """
+    baseline_results = {_key(entry): entry for entry in baseline["results"] if "error" not in entry}
+    rows = []
+    for entry in candidate["results"]:
+        reference = baseline_results.get(_key(entry))
+        if reference is None or "error" in entry:
+            continue
+        before, after = _throughput(reference), _throughput(entry)
+        speed = after / before if before and after else None
+        memory = entry["peak_rss_bytes"] / reference["peak_rss_bytes"] if reference["peak_rss_bytes"] else None
+        rows.append({
+            "mode": entry["mode"],
+            "rows": entry["rows"],
+            "width": entry["width"],
+            "throughput_ratio": speed,
+            "peak_rss_ratio": memory,
+            "regression": (speed is not None and speed < 1 - threshold)
+                          or (memory is not None and memory > 1 + threshold),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", help="Results of the reference version.")
+    parser.add_argument("candidate", help="Results of the version under test.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change counted as a regression. Default is 0.1.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.candidate) as file:
+        candidate = json.load(file)
+
+    rows = compare(baseline, candidate, args.threshold)
+    for row in rows:
+        speed = f"{row['throughput_ratio']:.2f}x" if row["throughput_ratio"] is not None else "n/a"
+        memory = f"{row['peak_rss_ratio']:.2f}x" if row["peak_rss_ratio"] is not None else "n/a"
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['mode']:16} {row['rows']:>10} rows  width {row['width']:>3}  "
+              f"throughput {speed:>7}  peak RSS {memory:>7}{flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
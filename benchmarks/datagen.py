@@ -0,0 +1,121 @@
+"""
+Synthetic benchmark tables generated inside MySQL.
+
+Rows are produced server side by cross joining a table of digits, so that tables of
+millions of rows are created without sending any data from the client. Every value
+is derived from the row id, which makes the tables identical across runs and machines.
+"""
+import hashlib
+import math
+
+DIGITS_TABLE = "bench_digits"
+BATCH_DIGITS = 6
+
+# Column type name -> (MySQL column definition, SQL expression of the row id `n` and column index `i`).
+COLUMN_TYPES = {
+    "int": ("INT NOT NULL", "CAST(MOD(n * 2654435761 + {i}, 2147483647) AS SIGNED)"),
+    "bigint": ("BIGINT NOT NULL", "n * 1000003 + {i}"),
+    "tinyint": ("TINYINT UNSIGNED NOT NULL", "MOD(n + {i}, 100)"),
+    "double": ("DOUBLE", "MOD(n * 7919 + {i}, 1000003) / 7.0"),
+    "decimal": ("DECIMAL(12, 2)", "MOD(n * 31 + {i}, 10000000) / 100"),
+    "varchar_low": ("VARCHAR(16)", "ELT(1 + MOD(n + {i}, 8), 'alpha', 'bravo', 'charlie', 'delta', "
+                                   "'echo', 'foxtrot', 'golf', 'hotel')"),
+    "varchar_high": ("VARCHAR(64)", "CONCAT('value_', n, '_', {i})"),
+    "datetime": ("DATETIME", "TIMESTAMP('2024-01-01') + INTERVAL MOD(n * 7919 + {i}, 31536000) SECOND"),
+    "enum": ("ENUM('open', 'paid', 'shipped', 'cancelled')", "ELT(1 + MOD(n + {i}, 4), 'open', 'paid', "
+                                                            "'shipped', 'cancelled')"),
+}
+DEFAULT_TYPES = ("int", "varchar_high", "double", "datetime", "tinyint", "varchar_low", "decimal", "enum", "bigint")
+
+
+def table_name(rows, width, types=DEFAULT_TYPES):
+    """
+    Get the name of the benchmark table for a row count, width and column type mix.
+
+    Args:
+        rows (int): Number of rows.
+        width (int): Number of columns besides the id.
+        types (tuple): Column type names, cycled over the columns.
+
+    Returns:
+        str: Table name.
+    """
+    digest = hashlib.sha1(",".join(types).encode("utf-8")).hexdigest()[:6]
+    return f"bench_{rows}_{width}_{digest}"
+
+
+def column_definitions(width, types=DEFAULT_TYPES):
+    """
+    Build the columns of a benchmark table.
+
+    Args:
+        width (int): Number of columns besides the id.
+        types (tuple): Column type names, cycled over the columns.
+
+    Returns:
+        list: (name, MySQL definition, SQL expression) for every column.
+    """
+    unknown = set(types) - set(COLUMN_TYPES)
+    if unknown:
+        raise ValueError(f"Unsupported column types: {sorted(unknown)}")
+    columns = []
+    for i in range(width):
+        type_name = types[i % len(types)]
+        definition, expression = COLUMN_TYPES[type_name]
+        columns.append((f"c{i}_{type_name}", definition, expression.format(i=i)))
+    return columns
+
+
+def ensure_table(su, rows, width, types=DEFAULT_TYPES, regenerate=False, verbose=False):
+    """
+    Create and fill a benchmark table unless it already exists with the expected row count.
+
+    Args:
+        su (SQU): Instance connected to the benchmark database.
+        rows (int): Number of rows.
+        width (int): Number of columns besides the id.
+        types (tuple): Column type names, cycled over the columns.
+        regenerate (bool): Flag to drop and recreate an existing table. Default is False.
+        verbose (bool): Flag to print progress. Default is False.
+
+    Returns:
+        str: Name of the benchmark table.
+    """
+    config = su.config
+    name = table_name(rows, width, types)
+    if not regenerate and config.table_exists(name):
+        count = config.fetch_rows(f"SELECT COUNT(*) FROM `{name}`")
+        if count and count[0][0] == rows:
+            return name
+
+    _ensure_digits(config)
+    columns = column_definitions(width, types)
+    column_sql = ", ".join(f"`{column}` {definition}" for column, definition, _ in columns)
+    _execute(config, f"DROP TABLE IF EXISTS `{name}`")
+    _execute(config, f"CREATE TABLE `{name}` (id BIGINT UNSIGNED NOT NULL PRIMARY KEY, {column_sql})")
+
+    digits = max(1, min(BATCH_DIGITS, math.ceil(math.log10(max(rows, 2)))))
+    batch_rows = 10 ** digits
+    offset = " + ".join(f"{10 ** k} * d{k}.d" for k in range(digits))
+    joins = " CROSS JOIN ".join(f"`{DIGITS_TABLE}` d{k}" for k in range(digits))
+    select_list = ", ".join(expression for _, _, expression in columns)
+    for base in range(0, rows, batch_rows):
+        _execute(
+            config,
+            f"INSERT INTO `{name}` SELECT n, {select_list} FROM "
+            f"(SELECT {base} + {offset} AS n FROM {joins}) AS seq WHERE n < {rows}",
+        )
+        if verbose:
+            print(f"Generated {min(base + batch_rows, rows)} of {rows} rows in {name}")
+    _execute(config, f"ANALYZE TABLE `{name}`")
+    return name
+
+
+def _ensure_digits(config):
+    _execute(config, f"CREATE TABLE IF NOT EXISTS `{DIGITS_TABLE}` (d TINYINT UNSIGNED NOT NULL PRIMARY KEY)")
+    _execute(config, f"INSERT IGNORE INTO `{DIGITS_TABLE}` VALUES " + ", ".join(f"({d})" for d in range(10)))
+
+
+def _execute(config, sql_command):
+    if not config.execute_sql(sql_command, use_sqlalchemy=False):
+        raise RuntimeError(f"Failed to execute benchmark setup command: {sql_command[:200]}")
@@ -0,0 +1,225 @@
+"""
+Benchmark the squ entry points against synthetic MySQL tables.
+
+Every (mode, table) pair runs in a fresh Python process. The first call in that
+process is the cold run: imports are loaded and connection pools are empty. The
+following calls are warm runs reusing the pools. Each run records its duration,
+rows per second and time to first row, and each process records its peak RSS.
+
+Usage:
+    python benchmarks/run.py --env tests/.env --rows 10000 100000 1000000 --output results.json
+"""
+import argparse
+import datetime
+import importlib
+import importlib.metadata
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from datagen import DEFAULT_TYPES, ensure_table  # noqa: E402
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+DEFAULT_WIDTH = 9
+DEFAULT_REPEAT = 3
+VERSIONED_LIBRARIES = ("pandas", "polars", "connectorx", "pyarrow", "dask", "sqlalchemy", "pymysql")
+
+
+def _count(result):
+    return result.num_rows if hasattr(result, "num_rows") else len(result)
+
+
+def _eager(method, **options):
+    def run(su, sql, first_row):
+        result = getattr(su, method)(sql, **options)
+        if result is None:
+            raise RuntimeError(f"{method} returned None")
+        first_row()
+        return _count(result)
+    return run
+
+
+def _streaming(method, **options):
+    def run(su, sql, first_row):
+        rows = 0
+        for chunk in getattr(su, method)(sql, **options):
+            if rows == 0:
+                first_row()
+            rows += len(chunk)
+        return rows
+    return run
+
+
+def _dask(su, sql, first_row):
+    result = su.qdd(sql)
+    if result is None:
+        raise RuntimeError("qdd returned None")
+    df = result.compute()
+    first_row()
+    return len(df)
+
+
+# Mode name -> (library imported before the baseline RSS is taken, runner, SQU options).
+MODES = {
+    "qpd": ("pandas", _eager("qpd"), {}),
+    "qpd_arrow": ("pandas", _eager("qpd", dtype_backend="pyarrow"), {}),
+    "qpd_optimized": ("pandas", _eager("qpd", optimize_dtypes=True), {}),
+    "qpd_iter": ("pandas", _streaming("qpd_iter"), {}),
+    "qpd_cached": ("pandas", _eager("qpd"), {"cache": True}),
+    "qpd_spill": ("pandas", _eager("qpd", spill=True), {}),
+    "qpd_auto": ("pandas", _eager("qpd", auto=True), {}),
+    "qpl": ("polars", _eager("qpl"), {}),
+    "qpl_partitioned": ("polars", _eager("qpl", partition_num=4), {}),
+    "qpl_iter": ("polars", _streaming("qpl_iter"), {}),
+    "qar": ("pyarrow", _eager("qar"), {}),
+    "qdd": ("dask.dataframe", _dask, {}),
+}
+DEFAULT_MODES = ("qpd", "qpd_arrow", "qpl", "qar", "qdd", "qpd_iter")
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _timed_run(runner, su, sql):
+    marks = {}
+    start = time.perf_counter()
+    rows = runner(su, sql, lambda: marks.setdefault("first_row", time.perf_counter()))
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "rows": rows,
+        "rows_per_second": rows / seconds if seconds > 0 else None,
+        "time_to_first_row": marks.get("first_row", start + seconds) - start,
+    }
+
+
+def run_worker(spec):
+    """
+    Run one mode against one table in the current process and return its measurements.
+
+    Args:
+        spec (dict): env_path, mode, table and repeat.
+
+    Returns:
+        dict: Cold run, warm runs, summary of the warm runs and peak RSS.
+    """
+    from squ import SQU
+
+    library, runner, squ_options = MODES[spec["mode"]]
+    importlib.import_module(library)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        su = SQU(env_path=spec["env_path"], sql_dir=str(Path(__file__).resolve().parent),
+                 cache_dir=cache_dir if squ_options.get("cache") else None)
+        sql = f"SELECT * FROM `{spec['table']}`"
+        baseline_rss = _peak_rss_bytes()
+        try:
+            cold = _timed_run(runner, su, sql)
+            warm = [_timed_run(runner, su, sql) for _ in range(spec["repeat"])]
+        finally:
+            su.close()
+    return {
+        "cold": cold,
+        "warm": warm,
+        "warm_median": {
+            key: statistics.median(run[key] for run in warm)
+            for key in ("seconds", "rows_per_second", "time_to_first_row")
+        } if warm else None,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _environment(su):
+    versions = {}
+    for name in ("squ",) + VERSIONED_LIBRARIES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    server = su.config.fetch_rows("SELECT VERSION()")
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "mysql_version": server[0][0] if server else None,
+        "versions": versions,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", default=str(ROOT / "tests" / ".env"), help="Path of the .env file of the database.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS), help="Row counts of the tables.")
+    parser.add_argument("--width", type=int, nargs="+", default=[DEFAULT_WIDTH],
+                        help="Number of columns of the tables besides the id.")
+    parser.add_argument("--types", default=",".join(DEFAULT_TYPES),
+                        help="Comma separated column types, cycled over the columns.")
+    parser.add_argument("--modes", nargs="+", default=list(DEFAULT_MODES), choices=sorted(MODES),
+                        help="Entry points to benchmark.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Number of warm runs per process.")
+    parser.add_argument("--regenerate", action="store_true", help="Recreate the tables even if they exist.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON results.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return 0
+
+    from squ import SQU
+
+    env_path = str(Path(args.env).resolve())
+    types = tuple(type_name.strip() for type_name in args.types.split(",") if type_name.strip())
+    report = {"results": []}
+    with SQU(env_path=env_path, sql_dir=str(Path(__file__).resolve().parent)) as su:
+        report["environment"] = _environment(su)
+        tables = [(rows, width, ensure_table(su, rows, width, types, args.regenerate, verbose=True))
+                  for rows in args.rows for width in args.width]
+
+    for rows, width, table in tables:
+        for mode in args.modes:
+            spec = {"env_path": env_path, "mode": mode, "table": table, "repeat": args.repeat}
+            entry = {"mode": mode, "rows": rows, "width": width, "types": list(types), "table": table}
+            process = subprocess.run([sys.executable, __file__, "--worker", json.dumps(spec)],
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                entry["error"] = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "failed"
+                print(f"{mode:16} {rows:>10} rows  failed: {entry['error']}")
+            else:
+                entry.update(json.loads(process.stdout.strip().splitlines()[-1]))
+                warm = entry["warm_median"] or entry["cold"]
+                print(f"{mode:16} {rows:>10} rows  cold {entry['cold']['seconds']:8.3f}s  "
+                      f"warm {warm['seconds']:8.3f}s  {warm['rows_per_second'] or 0:12.0f} rows/s  "
+                      f"first row {warm['time_to_first_row']:7.3f}s  peak RSS {entry['peak_rss_bytes'] / 2**20:8.1f} MiB")
+            report["results"].append(entry)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
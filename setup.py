@@ -12,13 +12,16 @@ setup(
     ],
     extras_require={
         "pandas": ["pandas", "sqlalchemy", "pymysql", "cryptography"],
-        "polars": ["polars", "connectorx", "pyarrow"],
+        "polars": ["polars", "connectorx", "pyarrow", "sqlalchemy", "pymysql", "cryptography"],
+        "arrow": ["connectorx", "pyarrow", "sqlalchemy", "pymysql", "cryptography"],
         "dask": ["dask[dataframe,diagnostics]", "pandas", "sqlalchemy", "pymysql", "cryptography"],
         "view": ["sqlalchemy", "pymysql"],
+        "cache": ["pyarrow"],
+        "async": ["aiomysql", "pandas", "sqlalchemy", "pymysql", "cryptography"],
         "tests": ["pytest", "pytest-mock", "tox"],
         "all": [
             "pandas", "sqlalchemy", "pymysql", "polars", "connectorx", "pyarrow",
-            "dask[dataframe,diagnostics]", "pytest", "pytest-mock", "tox", "cryptography"
+            "dask[dataframe,diagnostics]", "aiomysql", "pytest", "pytest-mock", "tox", "cryptography"
         ]
     },
     url="https://github.com/Spot2HQ/squ.git",
@@ -0,0 +1,419 @@
+import contextlib
+import hashlib
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from .instrument import enable_verbose_logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is only guarded within the process.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Persistent on-disk cache of query results stored as Parquet or Arrow IPC files.
+
+    Every entry is a single file that can be served to pandas, polars, dask or pyarrow.
+    Entries expire after their TTL, and the least recently used entries are evicted
+    once the total size of the cache exceeds max_bytes. Processes may share cache_dir:
+    the index is only written on put, invalidate and clear, merged with the one on disk
+    under a file lock, so entries written by other processes are kept and evicted too.
+
+    Attributes:
+        cache_dir (Path): Directory where cached results are stored.
+        max_bytes (int): Total size budget of the cache in bytes, or None for no limit.
+        default_ttl (float): Default time to live of an entry in seconds, or None for no expiry.
+        file_format (str): Storage format of new entries ('parquet' or 'arrow').
+        verbose (bool): Flag to control the verbosity of the output.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found in the cache or expired.
+        evictions (int): Number of entries removed to respect max_bytes.
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+    EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+    def __init__(self, cache_dir, max_bytes=None, default_ttl=None, file_format="parquet", verbose=False):
+        """
+        Initialize the ResultCache class.
+
+        Args:
+            cache_dir (str): Directory where cached results are stored. Created if missing.
+            max_bytes (int, optional): Total size budget in bytes. Default is None (no limit).
+            default_ttl (float, optional): Default time to live in seconds. Default is None (no expiry).
+            file_format (str): Storage format ('parquet' or 'arrow'). Default is 'parquet'.
+            verbose (bool): Flag to control the verbosity of the output. Default is False.
+        """
+        if file_format not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported cache format: {file_format}")
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.file_format = file_format
+        self.verbose = verbose
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._index = self._load_index()
+        if verbose:
+            enable_verbose_logging()
+
+    @staticmethod
+    def make_key(sql_query, target, params=None, variant=None):
+        """
+        Build the cache key of a query.
+
+        Args:
+            sql_query (str or list): SQL query or list of queries.
+            target (str): Connection target the query runs against.
+            params (dict, optional): Bind parameters of the query.
+            variant (dict, optional): Options changing the shape of the result, such as dtype mapping.
+
+        Returns:
+            str: Hex digest identifying the query, target, parameters and variant.
+        """
+        queries = sql_query if isinstance(sql_query, (list, tuple)) else [sql_query]
+        normalized = [re.sub(r"\s+", " ", query).strip().rstrip(";").strip() for query in queries]
+        items = [normalized, target, params or {}]
+        if variant:
+            items.append(variant)
+        payload = json.dumps(items, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cache entry, counting the hit or miss and dropping it if expired.
+
+        Access times are only kept in memory until the index is next written.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Path: Path of the cached file, or None if there is no valid entry.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                # Entries written by other processes sharing the directory are only on disk.
+                entry = self._load_index().get(key)
+                if entry is not None:
+                    self._index[key] = entry
+            path = self.cache_dir / entry["file"] if entry else None
+            if entry and entry["ttl"] is not None and time.time() - entry["created"] > entry["ttl"]:
+                logger.info(f"Cache entry expired: {key}") if self.verbose else None
+                self._remove(key)
+                entry = None
+            elif entry and not path.exists():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self.hits += 1
+            logger.info(f"Cache hit: {key}") if self.verbose else None
+            return path
+
+    def put(self, key, result, library, ttl=None):
+        """
+        Store a query result in the cache.
+
+        Dask results are written one partition at a time so that the full result is
+        never held in memory.
+
+        Args:
+            key (str): Cache key.
+            result (DataFrame): Result to store.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+            ttl (float, optional): Time to live in seconds. Defaults to default_ttl.
+
+        Returns:
+            Path: Path of the cached file.
+        """
+        pa = importlib.import_module("pyarrow")
+
+        if library == 'pandas':
+            tables = [pa.Table.from_pandas(result, preserve_index=False)]
+        elif library == 'polars':
+            tables = [result.to_arrow()]
+        elif library == 'arrow':
+            tables = [result]
+        elif library == 'dask':
+            tables = (
+                pa.Table.from_pandas(partition.compute(), preserve_index=False)
+                for partition in result.to_delayed()
+            )
+        else:
+            raise ValueError(f"Unsupported library: {library}")
+        return self.put_tables(key, tables, ttl)
+
+    def put_tables(self, key, tables, ttl=None):
+        """
+        Write a sequence of pyarrow Tables sharing one schema as a single cache entry.
+
+        Args:
+            key (str): Cache key.
+            tables (Iterable[pyarrow.Table]): Tables to write, in order.
+            ttl (float, optional): Time to live in seconds. Defaults to default_ttl.
+
+        Returns:
+            Path: Path of the cached file.
+        """
+        file_name = key + self.EXTENSIONS[self.file_format]
+        path = self.cache_dir / file_name
+        tmp_path = path.with_name(f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        write_tables(tmp_path, tables, self.file_format)
+        os.replace(tmp_path, path)
+
+        with self._index_lock():
+            now = time.time()
+            self._index = self._merged_index()
+            self._index[key] = {
+                "file": file_name,
+                "created": now,
+                "last_access": now,
+                "ttl": self.default_ttl if ttl is None else ttl,
+                "size": path.stat().st_size,
+            }
+            self._evict(keep=key)
+            self._save_index()
+        logger.info(f"Cached result {key} in {path}") if self.verbose else None
+        return path
+
+    def load(self, path, library, dtype_backend=None):
+        """
+        Load a cached file into the requested library.
+
+        Args:
+            path (Path): Path of the cached file.
+            library (str): Library to load the result into ('pandas', 'polars', 'dask', 'arrow').
+            dtype_backend (str, optional): Backend of pandas columns ('numpy' or 'pyarrow').
+
+        Returns:
+            DataFrame: Cached result.
+        """
+        return read_file(path, library, dtype_backend)
+
+    def invalidate(self, key):
+        """
+        Remove a single entry from the cache.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            bool: True if an entry was removed, False otherwise.
+        """
+        with self._index_lock():
+            self._index = self._merged_index()
+            removed = self._remove(key)
+            self._save_index()
+        return removed
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._index_lock():
+            self._index = self._merged_index()
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: Hits, misses, hit ratio, evictions, number of entries and total bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+            }
+
+    def _evict(self, keep=None):
+        if self.max_bytes is None:
+            return
+        total = sum(entry["size"] for entry in self._index.values())
+        by_last_access = sorted(self._index, key=lambda key: self._index[key]["last_access"])
+        for key in by_last_access:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index[key]["size"]
+            self._remove(key)
+            self.evictions += 1
+            logger.info(f"Evicted cache entry: {key}") if self.verbose else None
+
+    def _remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return False
+        try:
+            (self.cache_dir / entry["file"]).unlink()
+        except FileNotFoundError:
+            pass
+        return True
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        with self._lock, open(self.cache_dir / self.LOCK_FILE, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Closing the file releases the lock.
+            yield
+
+    def _merged_index(self):
+        # Entries are valid while their file exists, so removals by any process carry over.
+        disk_index = self._load_index()
+        merged = {}
+        for key in set(disk_index) | set(self._index):
+            entries = [entry for entry in (disk_index.get(key), self._index.get(key)) if entry is not None]
+            entry = dict(max(entries, key=lambda entry: entry["created"]))
+            entry["last_access"] = max(entry["last_access"] for entry in entries)
+            if (self.cache_dir / entry["file"]).exists():
+                merged[key] = entry
+        return merged
+
+    def _load_index(self):
+        try:
+            with open(self.cache_dir / self.INDEX_FILE, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self):
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_name(f"{self.INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(self._index, file)
+        os.replace(tmp_path, index_path)
+
+
+def write_tables(path, tables, file_format):
+    """
+    Stream a sequence of pyarrow Tables into a single Parquet or Arrow IPC file.
+
+    The schema of the first table is used for the file and later tables are cast to it.
+
+    Args:
+        path (Path): Destination file.
+        tables (Iterable[pyarrow.Table]): Tables to write, in order.
+        file_format (str): File format ('parquet' or 'arrow').
+
+    Returns:
+        int: Number of rows written.
+    """
+    pa = importlib.import_module("pyarrow")
+    pq = importlib.import_module("pyarrow.parquet")
+
+    writer = None
+    rows = 0
+    try:
+        for table in tables:
+            if writer is None:
+                schema = table.schema
+                if file_format == "parquet":
+                    writer = pq.ParquetWriter(path, schema)
+                else:
+                    writer = pa.ipc.new_file(pa.OSFile(str(path), "wb"), schema)
+            elif table.schema != schema:
+                table = table.cast(schema)
+            writer.write_table(table)
+            rows += table.num_rows
+        if writer is None:
+            raise ValueError("No result to write.")
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def read_file(path, library, dtype_backend=None):
+    """
+    Read a Parquet or Arrow IPC file into the requested library.
+
+    Arrow IPC files are memory-mapped, and dask and polars results stay lazy where possible.
+
+    Args:
+        path (Path): File to read.
+        library (str): Library to load the file into ('pandas', 'polars', 'dask', 'arrow').
+        dtype_backend (str, optional): Backend of pandas columns ('numpy' or 'pyarrow').
+
+    Returns:
+        DataFrame: Contents of the file.
+    """
+    path = Path(path)
+    is_parquet = path.suffix == ".parquet"
+    if library == 'polars':
+        pl = importlib.import_module("polars")
+        return pl.read_parquet(path) if is_parquet else pl.read_ipc(path)
+    if library == 'dask':
+        dd = importlib.import_module("dask.dataframe")
+        if is_parquet:
+            return dd.read_parquet(str(path))
+        pa = importlib.import_module("pyarrow")
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        if reader.num_record_batches == 0:
+            return dd.from_pandas(reader.read_all().to_pandas(), npartitions=1)
+        num_batches = reader.num_record_batches
+        return dd.from_map(_read_ipc_batch, [str(path)] * num_batches, range(num_batches))
+
+    pa = importlib.import_module("pyarrow")
+    if is_parquet:
+        pq = importlib.import_module("pyarrow.parquet")
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    if library == 'arrow':
+        return table
+    if library == 'pandas':
+        return arrow_to_pandas(table, dtype_backend)
+    raise ValueError(f"Unsupported library: {library}")
+
+
+def arrow_to_pandas(table, dtype_backend=None):
+    """
+    Convert a pyarrow Table to a pandas DataFrame.
+
+    With the 'pyarrow' backend every column wraps the Arrow buffers as an ArrowDtype
+    without copying. Otherwise numpy-backed columns are built, which is zero-copy for
+    numeric columns without nulls.
+
+    Args:
+        table (pyarrow.Table): Table to convert.
+        dtype_backend (str, optional): Backend of pandas columns ('numpy' or 'pyarrow').
+
+    Returns:
+        pandas.DataFrame: Converted table.
+    """
+    if dtype_backend == 'pyarrow':
+        pd = importlib.import_module("pandas")
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def _read_ipc_batch(path, index):
+    pa = importlib.import_module("pyarrow")
+    return pa.ipc.open_file(pa.memory_map(path)).get_batch(index).to_pandas()
@@ -1,6 +1,132 @@
+import asyncio
+import functools
+import importlib
+import logging
 import os
+import re
+import threading
+import time
 from pathlib import Path
 from dotenv import dotenv_values
+from .instrument import Instrumentation, current_trace, enable_verbose_logging
+from .planner import estimate_result
+from .replicas import DEFAULT_CHECK_INTERVAL, ReplicaSet, parse_hosts
+
+logger = logging.getLogger(__name__)
+
+# Same named-parameter syntax as sqlalchemy.text(), so one query works on every path.
+_BIND_PARAM_RE = re.compile(r"(?<![:\w\\]):(\w+)(?!:)")
+
+
+def quote_identifier(identifier):
+    """
+    Quote a possibly schema-qualified identifier with backticks.
+
+    Args:
+        identifier (str): Identifier such as table or schema.table.
+
+    Returns:
+        str: Quoted identifier such as `schema`.`table`.
+    """
+    return ".".join(f"`{part.strip('`')}`" for part in str(identifier).split("."))
+
+
+def render_query(sql_query, params):
+    """
+    Substitute named bind parameters into a query as escaped literals.
+
+    Used for drivers without bind parameter support, such as ConnectorX. Values are
+    escaped by pymysql exactly as they would be for a client-side bound query, and
+    lists or tuples are rendered as parenthesized lists for IN clauses.
+
+    Args:
+        sql_query (str): SQL query with :name placeholders.
+        params (dict): Values of the placeholders.
+
+    Returns:
+        str: SQL query with the values inlined.
+    """
+    if not params:
+        return sql_query
+    converters = importlib.import_module("pymysql.converters")
+
+    def replace(match):
+        name = match.group(1)
+        if name not in params:
+            raise ValueError(f"Missing value for bind parameter: {name}")
+        return converters.escape_item(params[name], "utf8mb4")
+
+    return _BIND_PARAM_RE.sub(replace, sql_query)
+
+
+def split_statements(script):
+    """
+    Split a SQL script into its statements.
+
+    Statements end at semicolons outside of quoted strings, quoted identifiers and
+    comments. DELIMITER lines, as understood by the mysql client, change the terminator
+    so that procedure and trigger bodies can contain semicolons.
+
+    Args:
+        script (str): SQL script.
+
+    Returns:
+        list: Statements without their terminator, skipping empty and comment-only ones.
+    """
+    statements = []
+    delimiter = ";"
+    start = i = 0
+    has_code = False
+    length = len(script)
+    while i < length:
+        char = script[i]
+        if not has_code and (i == 0 or script[i - 1] == "\n") and script[i:i + 10].upper() == "DELIMITER ":
+            end = script.find("\n", i)
+            end = length if end == -1 else end
+            delimiter = script[i + 10:end].strip() or ";"
+            start = i = end
+            continue
+        if char in ("'", '"', "`"):
+            i += 1
+            while i < length and script[i] != char:
+                i += 2 if script[i] == "\\" and char != "`" else 1
+            has_code = True
+        elif char == "#" or (script.startswith("--", i) and (i + 2 == length or script[i + 2].isspace())):
+            end = script.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif script.startswith("/*", i):
+            end = script.find("*/", i + 2)
+            # Executable comments such as /*!50100 ... */ are run by the server.
+            has_code = has_code or script.startswith("/*!", i)
+            i = length if end == -1 else end + 2
+            continue
+        elif script.startswith(delimiter, i):
+            if has_code:
+                statements.append(script[start:i].strip())
+            i += len(delimiter)
+            start = i
+            has_code = False
+            continue
+        elif not char.isspace():
+            has_code = True
+        i += 1
+    if has_code:
+        statements.append(script[start:].strip())
+    return statements
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_squ_execute_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["_squ_execute_start"].pop()
+    query_trace = current_trace()
+    if query_trace is not None:
+        # pymysql buffers the whole result inside execute, so this covers the network fetch too.
+        query_trace.add_phase("execute", time.perf_counter() - start)
+
 
 class Config:
     """
@@ -16,9 +142,17 @@ class Config:
         db_name (str): Database name.
         db_port (str): Database port.
         verbose (bool): Flag to control the verbosity of the output.
+        pool_size (int): Number of connections kept open in each engine's pool.
+        max_overflow (int): Number of connections allowed beyond pool_size under load.
+        pool_recycle (int): Seconds after which pooled connections are recycled.
+        pool_pre_ping (bool): Flag to test pooled connections for liveness before use.
+        instrumentation (Instrumentation): Hook registry and aggregator of query measurements.
+        replicas (ReplicaSet): Read replicas from DB_REPLICA_HOSTS, or None when reads go to the primary.
     """
 
-    def __init__(self, sql_dir, env_path, verbose=False):
+    def __init__(self, sql_dir, env_path, verbose=False, pool_size=5, max_overflow=10,
+                 pool_recycle=3600, pool_pre_ping=True, replica_balancing=None, replica_max_lag=None,
+                 replica_check_interval=None):
         """
         Initialize the Config class.
 
@@ -26,6 +160,16 @@ class Config:
             sql_dir (str): Directory where SQL files are stored.
             env_path (str): Path to the .env file containing database connection parameters.
             verbose (bool): Flag to control the verbosity of the output. Default is False.
+            pool_size (int): Number of connections kept open in each engine's pool. Default is 5.
+            max_overflow (int): Number of connections allowed beyond pool_size. Default is 10.
+            pool_recycle (int): Seconds after which pooled connections are recycled. Default is 3600.
+            pool_pre_ping (bool): Flag to test pooled connections before use. Default is True.
+            replica_balancing (str, optional): 'round_robin' or 'least_connections'. Defaults to
+                DB_REPLICA_BALANCING, or 'round_robin'.
+            replica_max_lag (float, optional): Replicas lagging more seconds than this are skipped.
+                Defaults to DB_REPLICA_MAX_LAG, or no limit.
+            replica_check_interval (float, optional): Seconds between health checks of a replica.
+                Defaults to DB_REPLICA_CHECK_INTERVAL, or 30.
         """
         self.sql_dir = Path(sql_dir)
         self.env_path = Path(env_path)
@@ -36,41 +180,346 @@ class Config:
         self.db_name = self.config.get("DB_NAME")
         self.db_port = self.config.get("DB_PORT")
         self.verbose = verbose
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self._engines = {}
+        self._engines_lock = threading.Lock()
+        self._async_pools = {}
+        self._async_pool_locks = {}
+        self._local_infile = {}
+        self._sql_files = {}
+        self.instrumentation = Instrumentation(verbose)
+        self.replicas = None
+        replica_hosts = parse_hosts(self.config.get("DB_REPLICA_HOSTS"), self.db_port)
+        if replica_hosts:
+            max_lag = replica_max_lag if replica_max_lag is not None else self.config.get("DB_REPLICA_MAX_LAG")
+            check_interval = (replica_check_interval if replica_check_interval is not None
+                              else self.config.get("DB_REPLICA_CHECK_INTERVAL") or DEFAULT_CHECK_INTERVAL)
+            self.replicas = ReplicaSet(
+                replica_hosts,
+                balancing=replica_balancing or self.config.get("DB_REPLICA_BALANCING") or 'round_robin',
+                max_lag=float(max_lag) if max_lag not in (None, "") else None,
+                check_interval=float(check_interval),
+                verbose=verbose,
+            )
+        if verbose:
+            enable_verbose_logging()
+        if self.sql_dir.is_dir():
+            self.load_sql_dir()
+
+    def __getstate__(self):
+        # Engines, locks and hooks cannot be pickled; workers rebuild their own pools lazily.
+        state = self.__dict__.copy()
+        state["_engines"] = {}
+        state["_async_pools"] = {}
+        state["_async_pool_locks"] = {}
+        del state["_engines_lock"]
+        del state["instrumentation"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._engines_lock = threading.Lock()
+        self.instrumentation = Instrumentation(self.verbose)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def target(self):
+        """
+        str: Identifier of the database the configuration connects to.
+        """
+        return f"{self.db_user}@{self.db_host}:{self.db_port}/{self.db_name}"
+
+    def get_engine(self, uri):
+        """
+        Get the pooled SQLAlchemy engine for a URI, creating it on first use.
+
+        Engines are kept in a registry keyed by URI so that every query against the
+        same target reuses the same connection pool.
+
+        Args:
+            uri (str): SQLAlchemy database URI.
+
+        Returns:
+            sqlalchemy.engine.Engine: Pooled engine for the URI.
+        """
+        with self._engines_lock:
+            engine = self._engines.get(uri)
+            if engine is None:
+                from sqlalchemy import create_engine, event
+                engine = create_engine(
+                    uri,
+                    pool_size=self.pool_size,
+                    max_overflow=self.max_overflow,
+                    pool_recycle=self.pool_recycle,
+                    pool_pre_ping=self.pool_pre_ping,
+                )
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+                self._engines[uri] = engine
+                if self.verbose:
+                    logger.info(f"Created pooled engine for URI: {uri}")
+            return engine
+
+    def pool_status(self, uri):
+        """
+        Get the status of the connection pool of a URI.
+
+        Args:
+            uri (str): SQLAlchemy database URI.
+
+        Returns:
+            dict: Pool size, connections checked out and overflow connections in use, or None
+                if no engine has been created for the URI.
+        """
+        engine = self._engines.get(uri)
+        if engine is None or not hasattr(engine.pool, "checkedout"):
+            return None
+        return {"size": engine.pool.size(), "checked_out": engine.pool.checkedout(), "overflow": engine.pool.overflow()}
+
+    def close(self):
+        """
+        Dispose every pooled engine and close their connections.
+        """
+        with self._engines_lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose()
+        if self.verbose and engines:
+            logger.info(f"Disposed {len(engines)} pooled engine(s).")
+
+    async def get_async_pool(self, host=None, port=None):
+        """
+        Get the aiomysql connection pool of a host for the running event loop, creating it on first use.
 
-    def create_mysql_uri(self, driver=None):
+        Async pools are bound to the event loop that created them, so one pool is kept per loop
+        and host. Creation is guarded by a per-loop lock, so concurrent first calls share a single pool.
+
+        Args:
+            host (str, optional): Host to connect to, the primary or a replica. Defaults to DB_HOST.
+            port (str, optional): Port of the host. Defaults to DB_PORT.
+
+        Returns:
+            aiomysql.Pool: Connection pool of the host for the running event loop.
+        """
+        aiomysql = importlib.import_module("aiomysql")
+
+        host, port = host or self.db_host, port or self.db_port
+        loop = asyncio.get_running_loop()
+        for other_loop in [other for other in self._async_pool_locks if other.is_closed()]:
+            self._async_pools.pop(other_loop, None)
+            del self._async_pool_locks[other_loop]
+        pool = self._async_pools.get(loop, {}).get((host, port))
+        if pool is not None:
+            return pool
+        async with self._async_pool_locks.setdefault(loop, asyncio.Lock()):
+            pool = self._async_pools.get(loop, {}).get((host, port))
+            if pool is None:
+                pool = await aiomysql.create_pool(
+                    host=host,
+                    port=int(port),
+                    user=self.db_user,
+                    password=self.db_pass,
+                    db=self.db_name,
+                    minsize=0,
+                    maxsize=self.pool_size + self.max_overflow,
+                    pool_recycle=self.pool_recycle,
+                    autocommit=True,
+                )
+                self._async_pools.setdefault(loop, {})[(host, port)] = pool
+                if self.verbose:
+                    logger.info(f"Created async connection pool for {self.db_user}@{host}:{port}/{self.db_name}")
+        return pool
+
+    async def aclose(self):
+        """
+        Close the async connection pools of the running event loop and dispose every pooled engine.
+        """
+        for pool in self._async_pools.pop(asyncio.get_running_loop(), {}).values():
+            pool.close()
+            await pool.wait_closed()
+        self.close()
+
+    def create_mysql_uri(self, driver=None, host=None, port=None):
         """
         Create a MySQL URI for connecting to the database.
 
         Args:
             driver (str): Optional driver for SQLAlchemy.
+            host (str, optional): Host to connect to instead of the primary, such as a replica.
+            port (str, optional): Port of host. Defaults to the primary port.
 
         Returns:
             str: MySQL URI.
         """
+        host, port = host or self.db_host, port or self.db_port
         if driver:
-            uri = f"mysql+{driver}://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+            uri = f"mysql+{driver}://{self.db_user}:{self.db_pass}@{host}:{port}/{self.db_name}"
         else:
-            uri = f"mysql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+            uri = f"mysql://{self.db_user}:{self.db_pass}@{host}:{port}/{self.db_name}"
         
         if self.verbose:
-            print(f"Created MySQL URI: {uri}")
+            logger.info(f"Created MySQL URI: {uri}")
         
         return uri
 
-    def create_connectorx_uri(self):
+    def create_connectorx_uri(self, host=None, port=None):
         """
         Create a ConnectorX URI for connecting to the database.
 
+        Args:
+            host (str, optional): Host to connect to instead of the primary, such as a replica.
+            port (str, optional): Port of host. Defaults to the primary port.
+
         Returns:
             str: ConnectorX URI.
         """
-        uri = f"mysql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+        uri = f"mysql://{self.db_user}:{self.db_pass}@{host or self.db_host}:{port or self.db_port}/{self.db_name}"
         
         if self.verbose:
-            print(f"Created ConnectorX URI: {uri}")
+            logger.info(f"Created ConnectorX URI: {uri}")
         
         return uri
 
+    def run_read(self, read):
+        """
+        Run a read on a healthy replica, failing over to the other replicas and then the primary.
+
+        When the read fails, the replica is probed. If the probe fails too, the replica is
+        marked down and the read is retried elsewhere; otherwise the error comes from the
+        query itself and is raised. Without replicas the read runs on the primary.
+
+        Args:
+            read (callable): Function taking the host and port to read from and returning the result.
+
+        Returns:
+            The result of read.
+        """
+        failed = []
+        while self.replicas is not None:
+            replica = self.replicas.acquire(self._probe_replica, exclude=failed)
+            if replica is None:
+                break
+            try:
+                return read(replica.host, replica.port)
+            except Exception as e:
+                if self.replicas.check(replica, self._probe_replica):
+                    raise
+                logger.warning(f"Read on {replica} failed, failing over: {e}")
+                self.replicas.mark_down(replica)
+                failed.append(replica)
+            finally:
+                self.replicas.release(replica)
+        return read(self.db_host, self.db_port)
+
+    async def run_read_async(self, read):
+        """
+        Await a read on a healthy replica, failing over to the other replicas and then the primary.
+
+        Works as run_read for coroutine functions. Health checks use blocking connections,
+        so they run on a worker thread instead of the event loop.
+
+        Args:
+            read (callable): Coroutine function taking the host and port to read from.
+
+        Returns:
+            The result of read.
+        """
+        loop = asyncio.get_running_loop()
+        failed = []
+        while self.replicas is not None:
+            replica = await loop.run_in_executor(
+                None, functools.partial(self.replicas.acquire, self._probe_replica, exclude=list(failed)))
+            if replica is None:
+                break
+            try:
+                return await read(replica.host, replica.port)
+            except Exception as e:
+                if await loop.run_in_executor(None, self.replicas.check, replica, self._probe_replica):
+                    raise
+                logger.warning(f"Read on {replica} failed, failing over: {e}")
+                self.replicas.mark_down(replica)
+                failed.append(replica)
+            finally:
+                self.replicas.release(replica)
+        return await read(self.db_host, self.db_port)
+
+    def _probe_replica(self, replica):
+        from sqlalchemy import text
+
+        engine = self.get_engine(self.create_mysql_uri("pymysql", replica.host, replica.port))
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            if self.replicas.max_lag is None:
+                return None
+            # SHOW REPLICA STATUS replaced SHOW SLAVE STATUS in MySQL 8.0.22.
+            for statement, column in (("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+                                      ("SHOW SLAVE STATUS", "Seconds_Behind_Master")):
+                try:
+                    row = connection.execute(text(statement)).mappings().first()
+                except Exception:
+                    connection.rollback()
+                    continue
+                if row is None:
+                    return None
+                # NULL lag means replication is stopped, so the replica is arbitrarily stale.
+                return float("inf") if row.get(column) is None else float(row[column])
+            return None
+
+    def load_sql_dir(self):
+        """
+        Load and validate every .sql file under sql_dir into the SQL file registry.
+
+        Returns:
+            dict: Registered queries keyed by file name relative to sql_dir.
+        """
+        for path in sorted(self.sql_dir.rglob("*.sql")):
+            self.get_sql_file(path.relative_to(self.sql_dir).as_posix())
+        if self.verbose:
+            logger.info(f"Registered {len(self._sql_files)} SQL file(s) from {self.sql_dir}")
+        return {name: query for name, (_, query) in self._sql_files.items()}
+
+    def get_sql_file(self, file_name):
+        """
+        Get the query of a SQL file from the registry, re-reading it only if its mtime changed.
+
+        Args:
+            file_name (str): Name of the SQL file relative to sql_dir.
+
+        Returns:
+            str: Content of the SQL file, or None if it is not a readable, non-empty file.
+        """
+        path = self.sql_dir / file_name
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except (OSError, ValueError):
+            self._sql_files.pop(file_name, None)
+            return None
+        cached = self._sql_files.get(file_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "r") as file:
+                query = file.read().strip()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"An error occurred while reading the file {file_name}: {e}")
+            return None
+        if not query:
+            logger.info(f"The file {file_name} is empty.") if self.verbose else None
+            return None
+        self._sql_files[file_name] = (mtime, query)
+        if self.verbose:
+            logger.info(f"Read SQL from file {file_name}: {query}")
+        return query
+
     def read_sql_file(self, file_name):
         """
         Read the content of a SQL file.
@@ -81,17 +530,194 @@ class Config:
         Returns:
             str: Content of the SQL file.
         """
+        query = self.get_sql_file(file_name)
+        if query is None and self.verbose:
+            logger.info(f"The file {file_name} was not found or could not be read.")
+        return query
+
+    def fetch_rows(self, sql_query, params=None, as_dict=False):
+        """
+        Execute a query on the pooled engine and return its rows.
+
+        Intended for small metadata lookups such as information_schema queries.
+
+        Args:
+            sql_query (str): SQL query to execute.
+            params (dict, optional): Named bind parameters for the query.
+            as_dict (bool): Flag to return each row as a dict keyed by column name. Default is False.
+
+        Returns:
+            list: Result rows as tuples or dicts, or None if the query failed.
+        """
+        from sqlalchemy import text
+
         try:
-            with open(self.sql_dir / file_name, "r") as file:
-                query = file.read().strip()
-                if self.verbose:
-                    print(f"Read SQL from file {file_name}: {query}")
-                return query
-        except FileNotFoundError:
-            print(f"The file {file_name} was not found.") if self.verbose else None
+            engine = self.get_engine(self.create_mysql_uri("pymysql"))
+            with engine.connect() as connection:
+                result = connection.execute(text(sql_query), params or {})
+                if as_dict:
+                    return [dict(row._mapping) for row in result]
+                return [tuple(row) for row in result]
+        except Exception as e:
+            logger.warning(f"An error occurred while fetching rows: {e}")
             return None
+
+    def get_integer_primary_key(self, table_name):
+        """
+        Find the integer primary key column of a table using information_schema.
+
+        Args:
+            table_name (str): Table name, optionally qualified as schema.table.
+
+        Returns:
+            str: Name of the leading integer primary key column, or None if there is none.
+        """
+        schema, _, table = table_name.strip("`").rpartition(".")
+        rows = self.fetch_rows(
+            "SELECT k.COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE k "
+            "JOIN information_schema.COLUMNS c ON c.TABLE_SCHEMA = k.TABLE_SCHEMA "
+            "AND c.TABLE_NAME = k.TABLE_NAME AND c.COLUMN_NAME = k.COLUMN_NAME "
+            "WHERE k.CONSTRAINT_NAME = 'PRIMARY' AND k.ORDINAL_POSITION = 1 "
+            "AND k.TABLE_SCHEMA = :schema AND k.TABLE_NAME = :table "
+            "AND c.DATA_TYPE IN ('tinyint', 'smallint', 'mediumint', 'int', 'bigint')",
+            {"schema": schema.strip("`") or self.db_name, "table": table.strip("`")},
+        )
+        column = rows[0][0] if rows else None
+        if self.verbose:
+            logger.info(f"Integer primary key of {table_name}: {column}")
+        return column
+
+    def table_exists(self, table_name):
+        """
+        Check whether a table exists using information_schema.
+
+        Args:
+            table_name (str): Table name, optionally qualified as schema.table.
+
+        Returns:
+            bool: True if the table exists, False otherwise.
+        """
+        schema, _, table = table_name.strip("`").rpartition(".")
+        rows = self.fetch_rows(
+            "SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table",
+            {"schema": schema.strip("`") or self.db_name, "table": table.strip("`")},
+        )
+        return bool(rows)
+
+    def estimate_rows(self, sql_query, params=None):
+        """
+        Estimate the number of rows a query returns using the optimizer's EXPLAIN output.
+
+        Args:
+            sql_query (str): SQL query to estimate.
+            params (dict, optional): Named bind parameters for the query.
+
+        Returns:
+            int: Estimated row count, or None if no estimate is available.
+        """
+        rows = self.explain_query(sql_query, params)
+        if not rows:
+            return None
+        estimate = estimate_result(rows, {}, 0)["rows"]
+        if self.verbose:
+            logger.info(f"Estimated {estimate} rows for query: {sql_query}")
+        return estimate
+
+    def explain_query(self, sql_query, params=None):
+        """
+        Get the optimizer's EXPLAIN output of a query.
+
+        Args:
+            sql_query (str): SQL query to explain.
+            params (dict, optional): Named bind parameters for the query.
+
+        Returns:
+            list: One dict per row of the plan, or None if the query could not be explained.
+        """
+        return self.fetch_rows(f"EXPLAIN {sql_query.strip().rstrip(';')}", params, as_dict=True)
+
+    def table_statistics(self, table_names):
+        """
+        Get the row count and average row length of tables from information_schema.
+
+        The values are the storage engine's statistics, which are approximate for InnoDB.
+
+        Args:
+            table_names (Iterable[str]): Table names, optionally qualified as schema.table.
+
+        Returns:
+            dict: Table name as given to a dict with its 'rows' and 'avg_row_length' in bytes.
+                Tables that do not exist, such as derived tables, are left out.
+        """
+        statistics = {}
+        for table_name in dict.fromkeys(table_names):
+            schema, _, table = str(table_name).strip("`").rpartition(".")
+            rows = self.fetch_rows(
+                "SELECT TABLE_ROWS, AVG_ROW_LENGTH FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table",
+                {"schema": schema.strip("`") or self.db_name, "table": table.strip("`")},
+            )
+            if rows:
+                statistics[table_name] = {"rows": int(rows[0][0] or 0), "avg_row_length": int(rows[0][1] or 0)}
+        return statistics
+
+    def local_infile_enabled(self):
+        """
+        Check whether the server accepts LOAD DATA LOCAL INFILE.
+
+        The local_infile server variable is read once per target and remembered, so bulk
+        writes against a server that rejects it do not pay for a temporary file each time.
+
+        Returns:
+            bool: True if the server accepts local loads, False otherwise or if the check failed.
+        """
+        enabled = self._local_infile.get(self.target)
+        if enabled is None:
+            rows = self.fetch_rows("SELECT @@GLOBAL.local_infile")
+            if rows is None:
+                return False
+            enabled = self._local_infile[self.target] = bool(rows and rows[0][0])
+        return enabled
+
+    def disable_local_infile(self):
+        """
+        Remember that LOAD DATA LOCAL INFILE failed against the target, so later writes skip it.
+        """
+        self._local_infile[self.target] = False
+
+    def describe_query(self, sql_query, params=None):
+        """
+        Get the column metadata MySQL reports for the result of a query, without fetching rows.
+
+        Args:
+            sql_query (str): SQL query to describe.
+            params (dict, optional): Named bind parameters for the query.
+
+        Returns:
+            list: One dict per column with its name, MySQL type code, flags, length and scale,
+                or None if the query failed.
+        """
+        probe = f"SELECT * FROM ({sql_query.strip().rstrip(';')}) AS _squ LIMIT 0"
+        try:
+            connection = self.get_engine(self.create_mysql_uri("pymysql")).raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(render_query(probe, params))
+                    fields = cursor._result.fields if cursor._result else []
+                    return [
+                        {
+                            "name": field.name,
+                            "type_code": field.type_code,
+                            "flags": field.flags,
+                            "length": field.length,
+                            "scale": field.scale,
+                        }
+                        for field in fields
+                    ]
+            finally:
+                connection.close()
         except Exception as e:
-            print(f"An error occurred while reading the file: {e}") if self.verbose else None
+            logger.warning(f"An error occurred while describing the query: {e}")
             return None
 
     def execute_sql(self, sql_command, use_sqlalchemy=True):
@@ -107,28 +733,36 @@ class Config:
         """
         db_url = self.create_mysql_uri("pymysql")
         try:
-            if use_sqlalchemy:
-                from sqlalchemy import create_engine
-                engine = create_engine(db_url)
-                with engine.connect() as connection:
-                    if self.verbose:
-                        print(f"Executing SQL command: {sql_command}")
-                    connection.execute(sql_command)
-            else:
-                import pymysql
-                connection = pymysql.connect(
-                    host=self.db_host,
-                    user=self.db_user,
-                    password=self.db_pass,
-                    database=self.db_name,
-                    port=int(self.db_port)
-                )
-                with connection.cursor() as cursor:
-                    if self.verbose:
-                        print(f"Executing SQL command: {sql_command}")
-                    cursor.execute(sql_command)
-                connection.commit()
+            with self.instrumentation.trace("command", sql=sql_command) as query_trace:
+                engine = self.get_engine(db_url)
+                if use_sqlalchemy:
+                    from sqlalchemy import text
+                    query_trace.engine = "sqlalchemy"
+                    with query_trace.phase("connect"):
+                        connection = engine.connect()
+                    with connection:
+                        if self.verbose:
+                            logger.info(f"Executing SQL command: {sql_command}")
+                        with connection.begin():
+                            result = connection.execute(text(sql_command))
+                            query_trace.rows = result.rowcount if result.rowcount >= 0 else None
+                else:
+                    query_trace.engine = "pymysql"
+                    with query_trace.phase("connect"):
+                        connection = engine.raw_connection()
+                    try:
+                        with connection.cursor() as cursor:
+                            if self.verbose:
+                                logger.info(f"Executing SQL command: {sql_command}")
+                            with query_trace.phase("execute"):
+                                cursor.execute(sql_command)
+                            query_trace.rows = cursor.rowcount if cursor.rowcount >= 0 else None
+                        with query_trace.phase("commit"):
+                            connection.commit()
+                    finally:
+                        connection.close()
+                query_trace.pool = self.pool_status(db_url)
             return True
         except Exception as e:
-            print(f"An error occurred while executing the command: {e}") if self.verbose else None
+            logger.warning(f"An error occurred while executing the command: {e}")
             return False
@@ -0,0 +1,233 @@
+import datetime
+import importlib
+
+# MySQL protocol type codes and column flags, as reported in the result set metadata.
+FIELD_DECIMAL = 0
+FIELD_TINY = 1
+FIELD_SHORT = 2
+FIELD_LONG = 3
+FIELD_FLOAT = 4
+FIELD_DOUBLE = 5
+FIELD_TIMESTAMP = 7
+FIELD_LONGLONG = 8
+FIELD_INT24 = 9
+FIELD_DATETIME = 12
+FIELD_YEAR = 13
+FIELD_NEWDECIMAL = 246
+FIELD_ENUM = 247
+FIELD_VAR_STRING = 253
+FIELD_STRING = 254
+FLAG_NOT_NULL = 1
+FLAG_UNSIGNED = 32
+FLAG_BINARY = 128
+FLAG_ENUM = 256
+
+INTEGER_BITS = {FIELD_TINY: 8, FIELD_SHORT: 16, FIELD_YEAR: 16, FIELD_INT24: 32, FIELD_LONG: 32, FIELD_LONGLONG: 64}
+DECIMAL_TYPES = ('float64', 'float32', 'decimal')
+DEFAULT_DTYPE_OPTIONS = {
+    # Type of DECIMAL columns: 'float64', 'float32' or 'decimal' for an exact fixed-point type.
+    "decimal": "float64",
+    # Strings whose distinct values are at most this share of the rows become categorical.
+    "category_threshold": 0.5,
+}
+
+
+def dtype_options(optimize_dtypes):
+    """
+    Resolve the optimize_dtypes argument of a query into dtype mapping options.
+
+    Args:
+        optimize_dtypes (bool or dict): True for the defaults, or a dict overriding
+            'decimal' and 'category_threshold'.
+
+    Returns:
+        dict: Dtype mapping options, or None when optimization is disabled.
+    """
+    if not optimize_dtypes:
+        return None
+    options = dict(DEFAULT_DTYPE_OPTIONS)
+    if isinstance(optimize_dtypes, dict):
+        unknown = set(optimize_dtypes) - set(DEFAULT_DTYPE_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unsupported dtype options: {sorted(unknown)}")
+        options.update(optimize_dtypes)
+    if options["decimal"] not in DECIMAL_TYPES:
+        raise ValueError(f"Unsupported decimal type: {options['decimal']}")
+    return options
+
+
+def column_kinds(fields):
+    """
+    Classify result columns from their MySQL metadata.
+
+    Args:
+        fields (list): Column metadata as returned by Config.describe_query.
+
+    Returns:
+        dict: Column name to a dict with the 'kind' ('int', 'float', 'decimal', 'enum',
+            'string' or None when the column is left unchanged) and kind specific details.
+    """
+    kinds = {}
+    for field in fields:
+        type_code, flags = field["type_code"], field["flags"]
+        unsigned = bool(flags & FLAG_UNSIGNED)
+        if type_code in INTEGER_BITS:
+            bits = INTEGER_BITS[type_code]
+            # INT24 values fit 32 bits, and YEAR is never negative.
+            kind = {"kind": "int", "bits": bits, "unsigned": unsigned or type_code == FIELD_YEAR}
+        elif type_code == FIELD_FLOAT:
+            kind = {"kind": "float", "bits": 32}
+        elif type_code == FIELD_DOUBLE:
+            kind = {"kind": "float", "bits": 64}
+        elif type_code in (FIELD_DECIMAL, FIELD_NEWDECIMAL):
+            scale = field["scale"]
+            precision = field["length"] - (1 if scale else 0) - (0 if unsigned else 1)
+            kind = {"kind": "decimal", "precision": max(1, min(precision, 38)), "scale": scale}
+        elif type_code == FIELD_ENUM or (type_code == FIELD_STRING and flags & FLAG_ENUM):
+            kind = {"kind": "enum"}
+        elif type_code in (FIELD_VAR_STRING, FIELD_STRING) and not flags & FLAG_BINARY:
+            kind = {"kind": "string"}
+        else:
+            kind = {"kind": None}
+        kind["nullable"] = not flags & FLAG_NOT_NULL
+        kinds[field["name"]] = kind
+    return kinds
+
+
+def pandas_dtypes(fields):
+    """
+    Map result columns to the pandas dtypes read_sql_query gives them when they hold values.
+
+    Used for the columns a sample of the result leaves undecided, because the sample is
+    empty or NULL there. Integers map to int64, or to float64 when the column may hold NULL
+    as read_sql_query turns integers holding NULL into floats. DECIMAL and floating-point
+    columns map to float64, DATETIME and TIMESTAMP columns and text columns to the dtypes
+    pandas infers for Python datetimes and strings, and every other column to object.
+
+    Args:
+        fields (list): Column metadata as returned by Config.describe_query.
+
+    Returns:
+        dict: Column name to pandas dtype.
+    """
+    pd = importlib.import_module("pandas")
+
+    kinds = column_kinds(fields)
+    dtypes = {}
+    for field in fields:
+        kind = kinds[field["name"]]
+        if kind["kind"] == "int":
+            unsigned = kind["unsigned"] and kind["bits"] == 64
+            dtypes[field["name"]] = "float64" if kind["nullable"] else "uint64" if unsigned else "int64"
+        elif kind["kind"] in ("float", "decimal"):
+            dtypes[field["name"]] = "float64"
+        elif field["type_code"] in (FIELD_TIMESTAMP, FIELD_DATETIME):
+            dtypes[field["name"]] = pd.Series([datetime.datetime(2000, 1, 1)]).dtype
+        elif kind["kind"] in ("string", "enum"):
+            dtypes[field["name"]] = pd.Series(["a"]).dtype
+        else:
+            dtypes[field["name"]] = "object"
+    return dtypes
+
+
+def optimize_pandas(df, kinds, options, detect_categories=True):
+    """
+    Cast the columns of a pandas DataFrame to the narrowest dtypes their MySQL types allow.
+
+    Integers become int8 to int64 or their unsigned variants, using the nullable
+    Int/UInt dtypes when the column may hold NULL. ENUM columns, and strings repeating
+    enough to pass category_threshold, become categorical. A column whose values do
+    not fit the target dtype is left unchanged.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to optimize.
+        kinds (dict): Column kinds from column_kinds.
+        options (dict): Dtype mapping options from dtype_options.
+        detect_categories (bool): Flag to turn low-cardinality strings into categoricals.
+            Disabled for dask partitions so that every partition has the same dtypes.
+
+    Returns:
+        pandas.DataFrame: DataFrame with the optimized dtypes.
+    """
+    pd = importlib.import_module("pandas")
+
+    casts = {}
+    for column in df.columns:
+        kind = kinds.get(column, {}).get("kind")
+        dtype = None
+        if kind == "int":
+            dtype = f"{'uint' if kinds[column]['unsigned'] else 'int'}{kinds[column]['bits']}"
+            if kinds[column]["nullable"] or df[column].hasnans:
+                dtype = dtype.capitalize() if not dtype.startswith("u") else "UInt" + dtype[4:]
+        elif kind == "float":
+            dtype = f"float{kinds[column]['bits']}"
+        elif kind == "decimal":
+            if options["decimal"] == "decimal":
+                pa = importlib.import_module("pyarrow")
+                dtype = pd.ArrowDtype(pa.decimal128(kinds[column]["precision"], kinds[column]["scale"]))
+            else:
+                dtype = options["decimal"]
+        elif kind == "enum" or (kind == "string" and detect_categories and _is_low_cardinality(
+                df[column].nunique(dropna=True), len(df), options)):
+            dtype = "category"
+        if dtype is not None and df[column].dtype != dtype:
+            casts[column] = dtype
+
+    for column, dtype in casts.items():
+        try:
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return df
+
+
+def optimize_polars(df, kinds, options):
+    """
+    Cast the columns of a polars DataFrame to the narrowest dtypes their MySQL types allow.
+
+    Applies the same rules as optimize_pandas, with Categorical for ENUM and
+    low-cardinality string columns and Decimal for exact DECIMAL columns.
+
+    Args:
+        df (polars.DataFrame): DataFrame to optimize.
+        kinds (dict): Column kinds from column_kinds.
+        options (dict): Dtype mapping options from dtype_options.
+
+    Returns:
+        polars.DataFrame: DataFrame with the optimized dtypes.
+    """
+    pl = importlib.import_module("polars")
+
+    integer_types = {
+        (8, False): pl.Int8, (16, False): pl.Int16, (32, False): pl.Int32, (64, False): pl.Int64,
+        (8, True): pl.UInt8, (16, True): pl.UInt16, (32, True): pl.UInt32, (64, True): pl.UInt64,
+    }
+    casts = {}
+    for column in df.columns:
+        kind = kinds.get(column, {}).get("kind")
+        dtype = None
+        if kind == "int":
+            dtype = integer_types[(kinds[column]["bits"], kinds[column]["unsigned"])]
+        elif kind == "float":
+            dtype = pl.Float32 if kinds[column]["bits"] == 32 else pl.Float64
+        elif kind == "decimal":
+            if options["decimal"] == "decimal":
+                dtype = pl.Decimal(kinds[column]["precision"], kinds[column]["scale"])
+            else:
+                dtype = pl.Float32 if options["decimal"] == "float32" else pl.Float64
+        elif kind == "enum" or (kind == "string" and _is_low_cardinality(
+                df[column].n_unique() - (1 if df[column].null_count() else 0), df.height, options)):
+            dtype = pl.Categorical
+        if dtype is not None and df.schema[column] != dtype:
+            casts[column] = dtype
+
+    for column, dtype in casts.items():
+        try:
+            df = df.with_columns(pl.col(column).cast(dtype))
+        except Exception:
+            pass
+    return df
+
+
+def _is_low_cardinality(distinct, rows, options):
+    return rows > 0 and distinct <= rows * options["category_threshold"]
@@ -0,0 +1,357 @@
+import collections
+import contextlib
+import contextvars
+import importlib
+import logging
+import math
+import sys
+import threading
+import time
+
+logger = logging.getLogger("squ")
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_MAX_SAMPLES = 10_000
+PERCENTILES = (50, 90, 99)
+
+_current_trace = contextvars.ContextVar("squ_trace", default=None)
+
+
+def enable_verbose_logging():
+    """
+    Print the messages of the squ loggers to standard output, as verbose instances do.
+
+    The handler is attached once to the 'squ' logger, so it is safe to call repeatedly.
+    """
+    if any(getattr(handler, "_squ_verbose", False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._squ_verbose = True
+    logger.addHandler(handler)
+    if logger.level == logging.NOTSET or logger.level > logging.INFO:
+        logger.setLevel(logging.INFO)
+
+
+class QueryTrace:
+    """
+    Measurements of a single query or command, filled in while it runs.
+
+    Phase timings are exclusive: the time of a phase excludes the phases nested in it,
+    so the phases of a trace add up to at most its total time.
+
+    Attributes:
+        kind (str): 'query' for reads or 'command' for statements run by execute_sql.
+        library (str): Library of the result, or None for commands.
+        sql (str or list): SQL query, list of queries or command.
+        engine (str): Engine that served the result ('sqlalchemy', 'pymysql', 'aiomysql', 'connectorx', 'dask' or 'cache').
+        cache (str): 'hit' or 'miss' when the result cache is enabled, otherwise None.
+        coalesced (bool): Flag set when the result was shared by an identical in-flight query.
+        host (str): Database host the query ran on, the primary or a replica.
+        strategy (str): Read strategy chosen by the auto mode, or None when it is not used.
+        rows (int): Number of rows returned or affected, when known.
+        bytes (int): Approximate in-memory size of the result in bytes, when known.
+        pool (dict): Pool status after the query (size, checked_out, overflow), when known.
+        phases (dict): Seconds spent in each phase, such as connect, execute and convert.
+        error (str): Error message if the query failed, otherwise None.
+    """
+
+    def __init__(self, kind, library=None, sql=None):
+        self.kind = kind
+        self.library = library
+        self.sql = sql
+        self.engine = None
+        self.cache = None
+        self.coalesced = False
+        self.host = None
+        self.strategy = None
+        self.rows = None
+        self.bytes = None
+        self.pool = None
+        self.phases = {}
+        self.error = None
+        self.started = time.time()
+        self.seconds = None
+        self._children = [0.0]
+
+    def add_phase(self, name, seconds):
+        """
+        Add time to a phase, counting it against the enclosing phase.
+
+        Args:
+            name (str): Name of the phase.
+            seconds (float): Time spent in the phase.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self._children[-1] += seconds
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Time a block of code as a phase of the trace.
+
+        Args:
+            name (str): Name of the phase.
+        """
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._children.pop()
+            self.add_phase(name, max(0.0, elapsed - nested))
+            self._children[-1] += nested
+
+    def to_dict(self):
+        """
+        Get the measurements of the trace.
+
+        Returns:
+            dict: Kind, library, SQL, engine, cache status, coalesced flag, host, auto strategy, rows, bytes,
+                pool status, phase timings, total seconds, start time and error.
+        """
+        return {
+            "kind": self.kind,
+            "library": self.library,
+            "sql": self.sql,
+            "engine": self.engine,
+            "cache": self.cache,
+            "coalesced": self.coalesced,
+            "host": self.host,
+            "strategy": self.strategy,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "pool": self.pool,
+            "phases": dict(self.phases),
+            "seconds": self.seconds,
+            "started": self.started,
+            "error": self.error,
+        }
+
+
+class Instrumentation:
+    """
+    Registry of query hooks and in-process aggregator of query measurements.
+
+    Every finished trace is aggregated per library (or 'command') and passed as a dict
+    to each registered hook. Latency percentiles are computed over the most recent
+    max_samples traces of each group.
+
+    Attributes:
+        verbose (bool): Flag to log a summary of every trace at INFO level instead of DEBUG.
+        max_samples (int): Number of recent durations kept per group for percentiles.
+    """
+
+    def __init__(self, verbose=False, max_samples=DEFAULT_MAX_SAMPLES):
+        """
+        Initialize the Instrumentation class.
+
+        Args:
+            verbose (bool): Flag to log a summary of every trace at INFO level. Default is False.
+            max_samples (int): Number of recent durations kept per group. Default is 10000.
+        """
+        self.verbose = verbose
+        self.max_samples = max_samples
+        self._hooks = []
+        self._lock = threading.Lock()
+        self._groups = {}
+
+    def add_hook(self, hook):
+        """
+        Register a callable receiving the dict of every finished trace.
+
+        Hooks run in the thread that ran the query. Exceptions raised by a hook are
+        logged and ignored.
+
+        Args:
+            hook (callable): Function taking the trace dict.
+
+        Returns:
+            callable: The hook, so that this method can be used as a decorator.
+        """
+        with self._lock:
+            self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook.
+
+        Args:
+            hook (callable): Hook previously passed to add_hook.
+
+        Returns:
+            bool: True if the hook was removed, False if it was not registered.
+        """
+        with self._lock:
+            if hook not in self._hooks:
+                return False
+            self._hooks.remove(hook)
+            return True
+
+    @contextlib.contextmanager
+    def trace(self, kind, library=None, sql=None):
+        """
+        Trace the queries run inside a block and emit the measurements when it ends.
+
+        Args:
+            kind (str): 'query' or 'command'.
+            library (str, optional): Library of the result.
+            sql (str or list, optional): SQL query or command.
+
+        Yields:
+            QueryTrace: Trace of the block, also reachable through current_trace.
+        """
+        query_trace = QueryTrace(kind, library, sql)
+        token = _current_trace.set(query_trace)
+        start = time.perf_counter()
+        try:
+            yield query_trace
+        except Exception as e:
+            query_trace.error = str(e)
+            raise
+        finally:
+            query_trace.seconds = time.perf_counter() - start
+            _current_trace.reset(token)
+            self.emit(query_trace)
+
+    def emit(self, query_trace):
+        """
+        Aggregate a finished trace, log its summary and pass it to the hooks.
+
+        Args:
+            query_trace (QueryTrace): Finished trace.
+        """
+        event = query_trace.to_dict()
+        group = event["library"] or event["kind"]
+        with self._lock:
+            stats = self._groups.setdefault(group, {
+                "count": 0, "errors": 0, "rows": 0, "bytes": 0, "cache_hits": 0, "coalesced": 0, "seconds": 0.0,
+                "durations": collections.deque(maxlen=self.max_samples), "phases": {},
+            })
+            stats["count"] += 1
+            stats["errors"] += event["error"] is not None
+            stats["rows"] += event["rows"] or 0
+            stats["bytes"] += event["bytes"] or 0
+            stats["cache_hits"] += event["cache"] == "hit"
+            stats["coalesced"] += event["coalesced"]
+            stats["seconds"] += event["seconds"]
+            stats["durations"].append(event["seconds"])
+            for name, seconds in event["phases"].items():
+                stats["phases"][name] = stats["phases"].get(name, 0.0) + seconds
+            hooks = list(self._hooks)
+
+        phases = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in event["phases"].items())
+        logger.log(
+            logging.INFO if self.verbose else logging.DEBUG,
+            f"{event['kind'].capitalize()} with {event['engine'] or group} took {event['seconds']:.3f}s "
+            f"({phases or 'no phases'}), rows={event['rows']}, bytes={event['bytes']}, cache={event['cache']}"
+            + (", coalesced" if event["coalesced"] else "")
+            + (f", error={event['error']}" if event["error"] else ""),
+        )
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.warning(f"An error occurred in query hook {hook!r}: {e}")
+
+    def stats(self):
+        """
+        Get the aggregated measurements of the traces emitted so far.
+
+        Returns:
+            dict: Per library (or 'command'): count, errors, rows, bytes, cache hits, coalesced
+                queries, total and mean seconds, p50, p90 and p99 latency, maximum latency and total seconds per phase.
+        """
+        with self._lock:
+            result = {}
+            for group, stats in self._groups.items():
+                durations = sorted(stats["durations"])
+                summary = {key: stats[key] for key in ("count", "errors", "rows", "bytes", "cache_hits", "coalesced",
+                                                       "seconds")}
+                summary["mean"] = stats["seconds"] / stats["count"]
+                for percentile in PERCENTILES:
+                    summary[f"p{percentile}"] = _percentile(durations, percentile)
+                summary["max"] = durations[-1] if durations else None
+                summary["phases"] = dict(stats["phases"])
+                result[group] = summary
+            return result
+
+    def reset(self):
+        """
+        Discard the aggregated measurements, keeping the registered hooks.
+        """
+        with self._lock:
+            self._groups.clear()
+
+
+def current_trace():
+    """
+    Get the trace of the query running in the current thread or task.
+
+    Returns:
+        QueryTrace: Active trace, or None when no query is being traced.
+    """
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """
+    Time a block of code as a phase of the active trace. Does nothing when no trace is active.
+
+    Args:
+        name (str): Name of the phase.
+    """
+    query_trace = _current_trace.get()
+    if query_trace is None:
+        yield
+        return
+    with query_trace.phase(name):
+        yield
+
+
+def annotate(**fields):
+    """
+    Set attributes of the active trace, such as engine, cache, rows or bytes.
+
+    Does nothing when no trace is active.
+
+    Args:
+        **fields: Trace attributes to set.
+    """
+    query_trace = _current_trace.get()
+    if query_trace is not None:
+        for name, value in fields.items():
+            setattr(query_trace, name, value)
+
+
+def result_size(result, library):
+    """
+    Count the rows and approximate in-memory bytes of a query result.
+
+    Args:
+        result (DataFrame): Query result.
+        library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+
+    Returns:
+        tuple: (rows, bytes), with None for values that cannot be known without computing a lazy result.
+    """
+    if library == 'pandas':
+        return len(result), int(result.memory_usage(index=False).sum())
+    if library == 'polars':
+        # Spilled polars results are LazyFrames scanning a file.
+        if isinstance(result, importlib.import_module("polars").LazyFrame):
+            return None, None
+        return result.height, int(result.estimated_size())
+    if library == 'arrow':
+        return result.num_rows, int(result.nbytes)
+    return None, None
+
+
+def _percentile(sorted_values, percentile):
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
@@ -0,0 +1,143 @@
+import datetime
+import json
+
+COMPARISONS = {"Eq": "=", "NotEq": "<>", "Lt": "<", "LtEq": "<=", "Gt": ">", "GtEq": ">="}
+FLIPPED = {"Eq": "Eq", "NotEq": "NotEq", "Lt": "Gt", "LtEq": "GtEq", "Gt": "Lt", "GtEq": "LtEq"}
+NUMERIC_SCALARS = ("Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32", "UInt64", "Float32", "Float64")
+
+
+def quote_column(column):
+    """
+    Quote a column name with backticks, escaping backticks inside it.
+
+    Args:
+        column (str): Column name.
+
+    Returns:
+        str: Quoted column name.
+    """
+    return "`" + column.replace("`", "``") + "`"
+
+
+def predicate_to_sql(predicate, prefix="_squ_p"):
+    """
+    Translate the pushable part of a polars predicate into a SQL condition.
+
+    The predicate is split on its top-level AND. Each part built from comparisons of a
+    column with a literal, IS NULL, IS NOT NULL, BETWEEN, AND, OR and NOT is translated,
+    and other parts are skipped. The condition never drops a row the predicate keeps, but
+    may keep more rows: string equality follows the collation of the column, which is
+    often case-insensitive. The predicate must therefore still be applied to the result.
+
+    Args:
+        predicate (polars.Expr): Boolean expression passed to the scan.
+        prefix (str): Prefix of the names of the bind parameters holding the literals.
+
+    Returns:
+        tuple: (condition, params, exact) where condition is the SQL condition with :name
+            placeholders or None if nothing could be pushed, params holds the literals, and
+            exact is True when the condition selects exactly the rows of the predicate.
+    """
+    try:
+        tree = json.loads(predicate.meta.serialize(format="json"))
+    except Exception:
+        return None, {}, False
+
+    params = {}
+    conditions = []
+    exact = True
+    for node in _split_and(tree):
+        try:
+            translated = _translate(node, params, prefix)
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError):
+            translated = None
+        if translated is None:
+            exact = False
+            continue
+        condition, condition_exact = translated
+        conditions.append(condition)
+        exact = exact and condition_exact
+    if not conditions:
+        return None, {}, False
+    return " AND ".join(f"({condition})" for condition in conditions), params, exact
+
+
+def _split_and(node):
+    binary = node.get("BinaryExpr") if isinstance(node, dict) else None
+    if binary and binary["op"] in ("And", "LogicalAnd"):
+        return _split_and(binary["left"]) + _split_and(binary["right"])
+    return [node]
+
+
+def _translate(node, params, prefix):
+    if "BinaryExpr" in node:
+        binary = node["BinaryExpr"]
+        op = binary["op"]
+        if op in ("And", "LogicalAnd", "Or", "LogicalOr"):
+            left = _translate(binary["left"], params, prefix)
+            right = _translate(binary["right"], params, prefix)
+            if left is None or right is None:
+                return None
+            keyword = "AND" if op in ("And", "LogicalAnd") else "OR"
+            return f"({left[0]}) {keyword} ({right[0]})", left[1] and right[1]
+        if op not in COMPARISONS:
+            return None
+        column, literal = binary["left"], binary["right"]
+        if "Column" not in column:
+            column, literal, op = literal, column, FLIPPED[op]
+        if "Column" not in column or "Literal" not in literal:
+            return None
+        value, is_string = _literal_value(literal["Literal"])
+        # Case-insensitive collations make string equality a superset; ordering would lose rows.
+        if value is None or (is_string and op != "Eq"):
+            return None
+        return f"{quote_column(column['Column'])} {COMPARISONS[op]} {_bind(value, params, prefix)}", not is_string
+
+    if "Function" in node:
+        function = node["Function"]
+        inputs, name = function["input"], function["function"].get("Boolean")
+        if name in ("IsNull", "IsNotNull") and len(inputs) == 1 and "Column" in inputs[0]:
+            keyword = "IS NULL" if name == "IsNull" else "IS NOT NULL"
+            return f"{quote_column(inputs[0]['Column'])} {keyword}", True
+        if name == "Not" and len(inputs) == 1:
+            inner = _translate(inputs[0], params, prefix)
+            # Negating a superset would drop rows, so only exact conditions can be negated.
+            if inner is None or not inner[1]:
+                return None
+            return f"NOT ({inner[0]})", True
+        if isinstance(name, dict) and name.get("IsBetween", {}).get("closed") == "Both" and len(inputs) == 3:
+            column, low, high = inputs
+            if "Column" not in column or "Literal" not in low or "Literal" not in high:
+                return None
+            (low_value, low_string), (high_value, high_string) = (_literal_value(low["Literal"]),
+                                                                  _literal_value(high["Literal"]))
+            if low_value is None or high_value is None or low_string or high_string:
+                return None
+            return (f"{quote_column(column['Column'])} BETWEEN {_bind(low_value, params, prefix)} "
+                    f"AND {_bind(high_value, params, prefix)}"), True
+    return None
+
+
+def _literal_value(literal):
+    if "Dyn" in literal:
+        kind, value = next(iter(literal["Dyn"].items()))
+        if kind in ("Int", "Float"):
+            return value, False
+        if kind == "Str":
+            return value, True
+        return None, False
+    if "Scalar" in literal:
+        kind, value = next(iter(literal["Scalar"].items()))
+        if kind in NUMERIC_SCALARS or kind == "Boolean":
+            return value, False
+        if kind == "String":
+            return value, True
+        if kind == "Date":
+            return datetime.date(1970, 1, 1) + datetime.timedelta(days=value), False
+    return None, False
+
+
+def _bind(value, params, prefix):
+    name = f"{prefix}{len(params)}"
+    params[name] = value
+    return f":{name}"
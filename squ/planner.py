@@ -0,0 +1,125 @@
+import os
+
+STRATEGIES = ('single', 'partitioned', 'stream', 'spill')
+DEFAULT_AUTO_THRESHOLDS = {
+    # Estimated rows from which a read is split over parallel ConnectorX connections.
+    "partition_rows": 1_000_000,
+    # Target number of rows per partition, and maximum number of partitions (None for the CPU count).
+    "rows_per_partition": 250_000,
+    "max_partitions": None,
+    # Estimated bytes from which pandas results are fetched in chunks through a server-side
+    # cursor, so the driver never buffers the whole result as Python tuples.
+    "stream_bytes": 256 * 2**20,
+    # Estimated bytes from which results are spilled to disk (None for half of the physical memory).
+    "spill_bytes": None,
+    # Row width assumed when no statistics are found for the tables of the plan.
+    "default_row_bytes": 256,
+    # Rows per chunk of streamed reads.
+    "chunksize": 50_000,
+}
+
+
+def resolve_thresholds(thresholds=None):
+    """
+    Resolve the thresholds of the auto mode.
+
+    Args:
+        thresholds (dict, optional): Values overriding DEFAULT_AUTO_THRESHOLDS.
+
+    Returns:
+        dict: Complete thresholds.
+    """
+    resolved = dict(DEFAULT_AUTO_THRESHOLDS)
+    if thresholds:
+        unknown = set(thresholds) - set(DEFAULT_AUTO_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unsupported auto thresholds: {sorted(unknown)}")
+        resolved.update(thresholds)
+    return resolved
+
+
+def estimate_result(explain_rows, table_statistics, default_row_bytes):
+    """
+    Estimate the rows and width of a query result from its plan and table statistics.
+
+    Rows are the product of the rows and filtered ratio of the outer plan steps, as the
+    optimizer reports them. The width is the sum of the average row lengths of the
+    tables the plan reads, which overestimates results selecting few columns.
+
+    Args:
+        explain_rows (list): EXPLAIN output as returned by Config.explain_query.
+        table_statistics (dict): Statistics as returned by Config.table_statistics.
+        default_row_bytes (int): Width used when none of the tables has statistics.
+
+    Returns:
+        dict: Estimated 'rows', 'row_bytes' and 'bytes', and the 'tables' the width comes from.
+    """
+    rows = 1.0
+    tables = []
+    for step in explain_rows:
+        if step.get("id") not in (1, None) or step.get("rows") is None:
+            continue
+        rows *= float(step["rows"]) * float(step.get("filtered") or 100.0) / 100.0
+        if step.get("table") in table_statistics:
+            tables.append(step["table"])
+    row_bytes = sum(table_statistics[table]["avg_row_length"] for table in tables) or default_row_bytes
+    return {"rows": int(rows), "row_bytes": row_bytes, "bytes": int(rows * row_bytes), "tables": tables}
+
+
+def choose_strategy(estimate, library, thresholds, partition_on=None, dtype_backend=None):
+    """
+    Choose how to read a query from the estimate of its result.
+
+    Results beyond spill_bytes are spilled to disk. Otherwise, results of at least
+    partition_rows are read over parallel connections when a partition column is known,
+    pandas results of at least stream_bytes are fetched in chunks, and the rest in one fetch.
+    ConnectorX already builds polars and arrow results without buffering Python rows.
+    Dask results are partitioned by qdd itself, so they are only ever spilled or left to it.
+    Pandas reads keep their dtypes: numpy-backed reads are never partitioned, since
+    ConnectorX would type their columns differently, and Arrow-backed reads never streamed.
+
+    Args:
+        estimate (dict): Estimate as returned by estimate_result.
+        library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+        thresholds (dict): Thresholds as returned by resolve_thresholds.
+        partition_on (str, optional): Integer column the query can be split on.
+        dtype_backend (str, optional): dtype_backend of a pandas read.
+
+    Returns:
+        dict: 'strategy' (one of STRATEGIES), the 'reason' for it and the query 'options'
+            implementing it.
+    """
+    spill_bytes = thresholds["spill_bytes"]
+    if spill_bytes is None:
+        memory = physical_memory()
+        spill_bytes = memory // 2 if memory else 8 * 2**30
+    if estimate["bytes"] >= spill_bytes:
+        return {"strategy": "spill", "reason": f"estimated {estimate['bytes']} bytes >= spill_bytes {spill_bytes}",
+                "options": {"spill": True}}
+    if library == 'dask':
+        return {"strategy": "partitioned", "reason": "dask reads are partitioned by qdd", "options": {}}
+
+    if estimate["rows"] >= thresholds["partition_rows"] and partition_on and (library != 'pandas' or dtype_backend):
+        max_partitions = thresholds["max_partitions"] or os.cpu_count() or 1
+        partition_num = max(2, min(max_partitions, -(-estimate["rows"] // thresholds["rows_per_partition"])))
+        return {"strategy": "partitioned",
+                "reason": f"estimated {estimate['rows']} rows >= partition_rows {thresholds['partition_rows']}",
+                "options": {"partition_on": partition_on, "partition_num": partition_num}}
+    if estimate["bytes"] >= thresholds["stream_bytes"] and library == 'pandas' and not dtype_backend:
+        return {"strategy": "stream",
+                "reason": f"estimated {estimate['bytes']} bytes >= stream_bytes {thresholds['stream_bytes']}",
+                "options": {"chunksize": thresholds["chunksize"]}}
+    return {"strategy": "single", "reason": "estimated result below every threshold", "options": {}}
+
+
+def physical_memory():
+    """
+    Get the physical memory of the machine.
+
+    Returns:
+        int: Size in bytes, or None where the platform does not report it.
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
@@ -0,0 +1,196 @@
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BALANCING_STRATEGIES = ('round_robin', 'least_connections')
+DEFAULT_CHECK_INTERVAL = 30.0
+
+
+class Replica:
+    """
+    Read replica endpoint together with its last known health.
+
+    Attributes:
+        host (str): Replica host.
+        port (str): Replica port.
+        healthy (bool): Flag set when the last health check succeeded within the lag limit.
+        lag (float): Replication lag in seconds seen by the last check, or None if unknown.
+        checked_at (float): Monotonic time of the last health check, or None before the first one.
+        in_flight (int): Number of reads currently routed to the replica.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.healthy = True
+        self.lag = None
+        self.checked_at = None
+        self.in_flight = 0
+
+    def __repr__(self):
+        return f"Replica({self.host}:{self.port})"
+
+
+class ReplicaSet:
+    """
+    Load balancer of read queries over a set of replicas.
+
+    Replicas are checked lazily: when a replica is picked and its last check is older
+    than check_interval, it is probed first. Unreachable replicas, and replicas lagging
+    more than max_lag seconds, are skipped until a later check finds them healthy again.
+
+    Attributes:
+        replicas (list): Replica endpoints.
+        balancing (str): 'round_robin' or 'least_connections'.
+        max_lag (float): Maximum replication lag in seconds, or None to ignore lag.
+        check_interval (float): Seconds between health checks of a replica.
+        verbose (bool): Flag to control the verbosity of the output.
+    """
+
+    def __init__(self, replicas, balancing='round_robin', max_lag=None, check_interval=DEFAULT_CHECK_INTERVAL,
+                 verbose=False):
+        """
+        Initialize the ReplicaSet class.
+
+        Args:
+            replicas (list): (host, port) pairs of the replicas.
+            balancing (str): 'round_robin' or 'least_connections'. Default is 'round_robin'.
+            max_lag (float, optional): Maximum replication lag in seconds. Default is None.
+            check_interval (float): Seconds between health checks of a replica. Default is 30.
+            verbose (bool): Flag to control the verbosity of the output. Default is False.
+        """
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(f"Unsupported replica balancing: {balancing}")
+        self.replicas = [Replica(host, port) for host, port in replicas]
+        self.balancing = balancing
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_counter"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def acquire(self, probe, exclude=()):
+        """
+        Pick a healthy replica for a read and count the read against it.
+
+        Args:
+            probe (callable): Function taking a Replica and returning its replication lag in
+                seconds (None if unknown), raising if the replica is unreachable.
+            exclude (Iterable[Replica]): Replicas not to pick, such as ones that already failed.
+
+        Returns:
+            Replica: Picked replica, to be passed to release, or None if no replica is healthy.
+        """
+        now = time.monotonic()
+        for replica in self.replicas:
+            if replica not in exclude and (replica.checked_at is None
+                                           or now - replica.checked_at >= self.check_interval):
+                self.check(replica, probe)
+
+        with self._lock:
+            candidates = [replica for replica in self.replicas if replica.healthy and replica not in exclude]
+            if not candidates:
+                return None
+            start = next(self._counter) % len(candidates)
+            ordered = candidates[start:] + candidates[:start]
+            if self.balancing == 'least_connections':
+                replica = min(ordered, key=lambda candidate: candidate.in_flight)
+            else:
+                replica = ordered[0]
+            replica.in_flight += 1
+        return replica
+
+    def release(self, replica):
+        """
+        Stop counting a read against a replica.
+
+        Args:
+            replica (Replica): Replica returned by acquire.
+        """
+        with self._lock:
+            replica.in_flight -= 1
+
+    def check(self, replica, probe):
+        """
+        Probe a replica and update its health.
+
+        Args:
+            replica (Replica): Replica to check.
+            probe (callable): Function returning the replication lag, raising if unreachable.
+
+        Returns:
+            bool: True if the replica is healthy, False otherwise.
+        """
+        try:
+            lag = probe(replica)
+            healthy = self.max_lag is None or lag is None or lag <= self.max_lag
+            if not healthy:
+                logger.warning(f"Skipping {replica}: replication lag {lag}s exceeds {self.max_lag}s")
+        except Exception as e:
+            lag, healthy = None, False
+            logger.warning(f"Health check of {replica} failed: {e}")
+        with self._lock:
+            replica.lag = lag
+            replica.healthy = healthy
+            replica.checked_at = time.monotonic()
+        return healthy
+
+    def mark_down(self, replica):
+        """
+        Mark a replica as unhealthy until its next health check.
+
+        Args:
+            replica (Replica): Replica that failed.
+        """
+        with self._lock:
+            replica.healthy = False
+            replica.checked_at = time.monotonic()
+
+    def status(self):
+        """
+        Get the health of every replica.
+
+        Returns:
+            list: One dict per replica with its host, port, health, lag and reads in flight.
+        """
+        with self._lock:
+            return [
+                {"host": replica.host, "port": replica.port, "healthy": replica.healthy, "lag": replica.lag,
+                 "in_flight": replica.in_flight}
+                for replica in self.replicas
+            ]
+
+
+def parse_hosts(value, default_port):
+    """
+    Parse a comma separated list of host or host:port entries.
+
+    Args:
+        value (str): List such as 'replica1:3306, replica2'.
+        default_port (str): Port of entries without one.
+
+    Returns:
+        list: (host, port) pairs.
+    """
+    hosts = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, separator, port = entry.rpartition(":")
+        hosts.append((host, port) if separator and port.isdigit() else (entry, default_port))
+    return hosts
@@ -0,0 +1,136 @@
+import collections
+import importlib
+import threading
+import time
+
+
+class SingleFlight:
+    """
+    Coalescing of identical concurrent calls into a single execution.
+
+    The first caller of a key runs the function while later callers of the same key
+    wait for it and receive its result. With a window, finished results are also kept
+    for that many seconds in a small LRU, so calls arriving right after still share it.
+
+    Attributes:
+        window (float): Seconds a finished result is reused, or 0 to only share in-flight calls.
+        max_entries (int): Maximum number of finished results kept for the window.
+        copy (bool): Flag to hand each waiting caller its own copy of the result instead
+            of the shared object.
+        shared (int): Number of calls answered with the result of another call.
+    """
+
+    def __init__(self, window=0.0, max_entries=32, copy=True):
+        """
+        Initialize the SingleFlight class.
+
+        Args:
+            window (float): Seconds a finished result is reused. Default is 0 (in-flight only).
+            max_entries (int): Maximum number of finished results kept. Default is 32.
+            copy (bool): Flag to copy the result for every waiting caller. Default is True.
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self.copy = copy
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._recent = collections.OrderedDict()
+
+    def do(self, key, function, library=None):
+        """
+        Run a function once for all concurrent callers of the same key.
+
+        Args:
+            key (str): Identity of the call.
+            function (callable): Function without arguments producing the result.
+            library (str, optional): Library of the result, used to copy it on handoff.
+
+        Returns:
+            tuple: (result, shared) where shared is True if the result came from another call.
+        """
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is not None and time.monotonic() - recent[0] <= self.window:
+                self._recent.move_to_end(key)
+                self.shared += 1
+                return self._handoff(recent[1], library), True
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self.shared += 1
+            if call.error is not None:
+                raise call.error
+            return self._handoff(call.result, library), True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                handed_off = call.waiters > 0 or self.window > 0
+                if call.error is None and call.result is not None and self.window > 0:
+                    self._recent[key] = (time.monotonic(), call.result)
+                    self._recent.move_to_end(key)
+                    while len(self._recent) > self.max_entries:
+                        self._recent.popitem(last=False)
+            call.done.set()
+        # Once shared, the leader also gets a copy so that every copy is taken from an untouched result.
+        return (self._handoff(call.result, library) if handed_off else call.result), False
+
+    def clear(self):
+        """
+        Forget the finished results kept for the window.
+        """
+        with self._lock:
+            self._recent.clear()
+
+    def _handoff(self, result, library):
+        if not self.copy:
+            return result
+        return copy_result(result, library)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+def copy_result(result, library):
+    """
+    Copy a query result so that it can be modified without affecting other holders.
+
+    Polars frames are cloned, which shares the immutable column buffers. pyarrow tables
+    and lazy polars and dask frames are immutable and returned as is, so spilled results
+    stay alive, and keep their file, as long as any caller holds them. pandas frames are shallow
+    copies under copy-on-write and deep copies otherwise.
+
+    Args:
+        result (DataFrame): Result to copy.
+        library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+
+    Returns:
+        DataFrame: Independent result.
+    """
+    if result is None:
+        return None
+    if library == 'polars':
+        return result if isinstance(result, importlib.import_module("polars").LazyFrame) else result.clone()
+    if library == 'pandas':
+        pd = importlib.import_module("pandas")
+        copy_on_write = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+        return result.copy(deep=not copy_on_write)
+    return result
@@ -0,0 +1,135 @@
+import datetime
+import decimal
+import importlib
+import json
+import logging
+import os
+from pathlib import Path
+from .instrument import enable_verbose_logging
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """
+    Local Parquet snapshot of a query result together with its last watermark.
+
+    The watermark is the highest value of the watermark column seen so far. It is kept
+    in a JSON file next to the snapshot so that each refresh only fetches newer rows.
+
+    Attributes:
+        path (Path): Path of the Parquet snapshot.
+        state_path (Path): Path of the JSON file holding the watermark.
+        watermark_column (str): Column whose values only grow, such as updated_at or an auto-increment id.
+        key_columns (list): Columns identifying a row, used to upsert changed rows, or None to append.
+        verbose (bool): Flag to control the verbosity of the output.
+    """
+
+    def __init__(self, path, watermark_column, key_columns=None, verbose=False):
+        """
+        Initialize the Snapshot class.
+
+        Args:
+            path (str): Path of the Parquet snapshot.
+            watermark_column (str): Column whose values only grow.
+            key_columns (list, optional): Columns identifying a row. Default is None (append only).
+            verbose (bool): Flag to control the verbosity of the output. Default is False.
+        """
+        self.path = Path(path)
+        self.state_path = self.path.with_name(self.path.name + ".watermark.json")
+        self.watermark_column = watermark_column
+        self.key_columns = [key_columns] if isinstance(key_columns, str) else key_columns
+        self.verbose = verbose
+        if verbose:
+            enable_verbose_logging()
+
+    def exists(self):
+        """
+        Check whether the snapshot has been written before.
+
+        Returns:
+            bool: True if the snapshot file exists, False otherwise.
+        """
+        return self.path.is_file()
+
+    def load_watermark(self):
+        """
+        Get the last watermark, falling back to the maximum of the snapshot if the state file is missing.
+
+        Returns:
+            The last watermark value, or None if the snapshot is empty or missing.
+        """
+        try:
+            with open(self.state_path, "r") as file:
+                return _decode_value(json.load(file)["watermark"])
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+        if not self.exists():
+            return None
+        pl = importlib.import_module("polars")
+        return pl.scan_parquet(self.path).select(pl.col(self.watermark_column).max()).collect().item()
+
+    def merge(self, delta):
+        """
+        Merge newly fetched rows into the snapshot and advance the watermark.
+
+        With key_columns, snapshot rows whose key appears in delta are replaced. Otherwise
+        delta is appended. The merge streams through a temporary file that atomically
+        replaces the snapshot, and the watermark is only saved once the data is in place.
+
+        Args:
+            delta (polars.DataFrame): Rows fetched beyond the previous watermark.
+
+        Returns:
+            int: Number of rows merged.
+        """
+        pl = importlib.import_module("polars")
+
+        if self.exists() and delta.height == 0:
+            return 0
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        if self.exists():
+            current = pl.scan_parquet(self.path)
+            if self.key_columns:
+                current = current.join(delta.lazy().select(self.key_columns), on=self.key_columns, how="anti")
+            pl.concat([current, delta.lazy()], how="vertical_relaxed").sink_parquet(tmp_path)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            delta.write_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+
+        if delta.height:
+            watermark = delta.select(pl.col(self.watermark_column).max()).item()
+            previous = self.load_watermark() if self.state_path.exists() else None
+            if previous is None or watermark > previous:
+                self._save_watermark(watermark)
+        if self.verbose:
+            logger.info(f"Merged {delta.height} rows into snapshot {self.path}")
+        return delta.height
+
+    def _save_watermark(self, watermark):
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump({"column": self.watermark_column, "watermark": _encode_value(watermark)}, file)
+        os.replace(tmp_path, self.state_path)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"type": "decimal", "value": str(value)}
+    return {"type": "value", "value": value}
+
+
+def _decode_value(encoded):
+    kind, value = encoded["type"], encoded["value"]
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    if kind == "decimal":
+        return decimal.Decimal(value)
+    return value
@@ -0,0 +1,167 @@
+import importlib
+import itertools
+import logging
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from .cache import write_tables
+from .instrument import enable_verbose_logging
+
+logger = logging.getLogger(__name__)
+
+# pandas and arrow results are memory-mapped from uncompressed Arrow IPC files, while
+# polars and dask scan compressed Parquet files lazily.
+SPILL_FORMATS = {'pandas': 'arrow', 'arrow': 'arrow', 'polars': 'parquet', 'dask': 'parquet'}
+
+
+class SpillStore:
+    """
+    Temporary directory of query results spilled to disk.
+
+    Results are streamed batch by batch into one file each, so writing them never holds
+    more than a batch in memory, and are returned as frames backed by the file. Each file
+    is removed once its result is garbage collected. The directory is created on first
+    use and removed, with any file left, by close, when the store is garbage collected,
+    or when the interpreter exits.
+
+    Attributes:
+        spill_dir (str): Parent directory of the temporary directory, or None for the system default.
+        verbose (bool): Flag to control the verbosity of the output.
+    """
+
+    def __init__(self, spill_dir=None, verbose=False):
+        """
+        Initialize the SpillStore class.
+
+        Args:
+            spill_dir (str, optional): Parent directory of the temporary directory. Default is None.
+            verbose (bool): Flag to control the verbosity of the output. Default is False.
+        """
+        self.spill_dir = spill_dir
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._directory = None
+        self._finalizer = None
+        if verbose:
+            enable_verbose_logging()
+
+    @property
+    def directory(self):
+        """
+        Path: Temporary directory holding the spilled files, created on first access.
+        """
+        with self._lock:
+            if self._directory is None:
+                if self.spill_dir is not None:
+                    Path(self.spill_dir).mkdir(parents=True, exist_ok=True)
+                self._directory = Path(tempfile.mkdtemp(prefix="squ-spill-", dir=self.spill_dir))
+                self._finalizer = weakref.finalize(self, shutil.rmtree, str(self._directory), ignore_errors=True)
+            return self._directory
+
+    def spill(self, reader, library):
+        """
+        Write a stream of record batches to a new file and open it in the requested library.
+
+        Args:
+            reader (pyarrow.RecordBatchReader): Batches of the result.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+
+        The file is removed when the returned result is garbage collected. Lazy polars and
+        dask frames derived from it read the same file, so the result must be kept while
+        they are in use.
+
+        Returns:
+            tuple: (result, rows) where result is a polars LazyFrame, a dask DataFrame, or a
+                pandas DataFrame or pyarrow Table memory-mapped from the file.
+        """
+        file_format = SPILL_FORMATS[library]
+        suffix = ".parquet" if file_format == "parquet" else ".arrow"
+        path = self.directory / f"result-{next(self._counter)}{suffix}"
+        try:
+            rows = write_tables(path, _tables(reader), file_format)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+        if self.verbose:
+            logger.info(f"Spilled {rows} rows to {path}")
+        result = self.open(path, library)
+        weakref.finalize(result, _remove, path)
+        return result, rows
+
+    def open(self, path, library):
+        """
+        Open a spilled file without loading it into memory.
+
+        Args:
+            path (Path): Spilled file.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+
+        Returns:
+            DataFrame: Lazy or memory-mapped result.
+        """
+        path = Path(path)
+        if library == 'polars':
+            pl = importlib.import_module("polars")
+            return pl.scan_parquet(path) if path.suffix == ".parquet" else pl.scan_ipc(path, memory_map=True)
+        if library == 'dask':
+            dd = importlib.import_module("dask.dataframe")
+            return dd.read_parquet(str(path))
+
+        pa = importlib.import_module("pyarrow")
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        if library == 'arrow':
+            return table
+        if library == 'pandas':
+            # ArrowDtype columns wrap the mapped buffers, so pages are read from disk on access.
+            pd = importlib.import_module("pandas")
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        raise ValueError(f"Unsupported library: {library}")
+
+    def size(self):
+        """
+        Get the total size of the spilled files.
+
+        Returns:
+            int: Size in bytes.
+        """
+        if self._directory is None or not self._directory.is_dir():
+            return 0
+        return sum(path.stat().st_size for path in self._directory.iterdir() if path.is_file())
+
+    def close(self):
+        """
+        Remove the temporary directory and every spilled file.
+
+        Frames returned earlier must not be used afterwards.
+        """
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+                if self.verbose:
+                    logger.info(f"Removed spill directory {self._directory}")
+            self._directory = None
+            self._finalizer = None
+
+
+def _remove(path):
+    # Memory-mapped files cannot be removed on Windows; close removes them with the directory.
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _tables(reader):
+    pa = importlib.import_module("pyarrow")
+
+    empty = True
+    for batch in reader:
+        if batch.num_rows:
+            empty = False
+            yield pa.Table.from_batches([batch], schema=reader.schema)
+    # An empty result still produces a file, so its schema survives.
+    if empty:
+        yield reader.schema.empty_table()
@@ -1,5 +1,124 @@
+import asyncio
+import functools
 import importlib
-from .config import Config
+import importlib.util
+import logging
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from .cache import ResultCache, arrow_to_pandas
+from .config import Config, quote_identifier, render_query, split_statements
+from .dtypes import column_kinds, dtype_options, optimize_pandas, optimize_polars, pandas_dtypes
+from .instrument import annotate, enable_verbose_logging, phase, result_size
+from .lazy import predicate_to_sql, quote_column
+from .planner import choose_strategy, estimate_result, resolve_thresholds
+from .singleflight import SingleFlight
+from .snapshot import Snapshot
+from .spill import SpillStore
+from .writer import DEFAULT_BATCH_BYTES, BulkWriter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROWS_PER_PARTITION = 250_000
+DEFAULT_CHUNKSIZE = 10_000
+DEFAULT_SPILL_CHUNKSIZE = 100_000
+LIBRARIES = ('pandas', 'polars', 'dask', 'arrow')
+
+_SOURCE_TABLE_RE = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>`?[\w$]+`?(?:\.`?[\w$]+`?)?)(?P<rest>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+# Clauses and select lists whose result would change if each partition were read on its own.
+_UNPARTITIONABLE_REST_RE = re.compile(r"\(|\b(?:JOIN|UNION|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT|WINDOW)\b",
+                                      re.IGNORECASE)
+_UNPARTITIONABLE_COLUMNS_RE = re.compile(
+    r"\b(?:DISTINCT|OVER)\b|\b(?:COUNT|SUM|AVG|MIN|MAX|GROUP_CONCAT|JSON_ARRAYAGG|JSON_OBJECTAGG|BIT_AND|BIT_OR"
+    r"|BIT_XOR|STD|STDDEV\w*|VARIANCE|VAR_\w+)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def _read_sql_partition(config, db_url, sql_query, params=None, meta=None):
+    """
+    Read one partition of a query into a pandas DataFrame.
+
+    Defined at module level so that dask can ship it, together with the picklable
+    Config, to the worker that computes the partition.
+
+    Args:
+        config (Config): Configuration object owning the engine registry.
+        db_url (str): Database URL, or None to read from a healthy replica picked, with
+            failover, when the partition is computed.
+        sql_query (str): SQL query for the partition.
+        params (dict, optional): Named bind parameters for the query.
+        meta (pandas.DataFrame, optional): Empty frame of the dtypes the partition must match.
+
+    Returns:
+        pandas.DataFrame: Rows of the partition.
+    """
+    pd = importlib.import_module("pandas")
+    from sqlalchemy import text
+
+    def read(url):
+        with config.get_engine(url).connect() as connection:
+            return pd.read_sql_query(text(sql_query), connection, params=params)
+
+    if db_url is None:
+        df = config.run_read(lambda host, port: read(config.create_mysql_uri("pymysql", host, port)))
+    else:
+        df = read(db_url)
+    return _match_meta(df, meta) if meta is not None else df
+
+
+def _match_meta(df, meta):
+    """
+    Cast the columns of a partition whose inferred dtype differs from the dask meta.
+
+    read_sql_query infers dtypes from the values it reads, so a column that is NULL
+    throughout a partition is read as object. Numeric columns are left as read, since
+    dask compares numeric dtypes as equal, and integer columns holding NULL become floats
+    as they do in qpd. A column whose values do not fit the meta dtype is left unchanged.
+
+    Args:
+        df (pandas.DataFrame): Partition as read.
+        meta (pandas.DataFrame): Empty frame of the expected dtypes.
+
+    Returns:
+        pandas.DataFrame: Partition with the dtypes of the meta.
+    """
+    api = importlib.import_module("pandas.api.types")
+
+    for column, dtype in meta.dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if api.is_numeric_dtype(df[column].dtype) and api.is_numeric_dtype(dtype):
+            continue
+        try:
+            df[column] = df[column].astype("float64" if api.is_integer_dtype(dtype) else dtype)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return df
+
+
+def _frame_builder(library):
+    """
+    Get a function building a DataFrame from fetched rows.
+
+    Args:
+        library (str): Library of the DataFrame ('pandas', 'polars').
+
+    Returns:
+        callable: Function taking the rows and column names and returning a DataFrame.
+    """
+    if library == 'pandas':
+        pd = importlib.import_module("pandas")
+        return lambda rows, columns: pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    pl = importlib.import_module("polars")
+    return lambda rows, columns: pl.DataFrame(
+        [tuple(row) for row in rows], schema=columns, orient="row", infer_schema_length=None
+    )
+
 
 class SQU:
     """
@@ -7,10 +126,15 @@ class SQU:
 
     Attributes:
         config (Config): Configuration object.
+        cache (ResultCache): On-disk result cache, or None when caching is disabled.
+        spill (SpillStore): Temporary files of results spilled to disk.
+        auto_thresholds (dict): Thresholds of the auto mode, which can be tuned in place.
         verbose (bool): Flag to control the verbosity of the output.
     """
 
-    def __init__(self, env_path, sql_dir=None, verbose=False):
+    def __init__(self, env_path, sql_dir=None, verbose=False, cache_dir=None, cache_ttl=None,
+                 cache_max_bytes=None, cache_format="parquet", coalesce=False, coalesce_window=0.0,
+                 coalesce_copy=True, spill_dir=None, auto_thresholds=None, **pool_options):
         """
         Initialize the SQU class.
 
@@ -18,148 +142,1352 @@ class SQU:
             env_path (str): Path to the .env file containing database connection parameters.
             sql_dir (str, optional): Directory where SQL files are stored. Default is None.
             verbose (bool): Flag to control the verbosity of the output. Default is False.
+            cache_dir (str, optional): Directory of the on-disk result cache. Caching is
+                disabled when None. Default is None.
+            cache_ttl (float, optional): Default time to live of cached results in seconds. Default is None.
+            cache_max_bytes (int, optional): Size budget of the result cache in bytes. Default is None.
+            cache_format (str): Format of cached results ('parquet' or 'arrow'). Default is 'parquet'.
+            coalesce (bool): Flag to run identical concurrent queries (same SQL, parameters and
+                options) once and share the result between the callers. Default is False.
+            coalesce_window (float): Seconds a coalesced result keeps being shared after the
+                query finished. Default is 0 (only while the query runs).
+            coalesce_copy (bool): Flag to give each caller its own copy of a shared result.
+                When False, callers share the same object and must treat it as read-only. Default is True.
+            spill_dir (str, optional): Directory where results read with spill=True are written.
+                Defaults to the system temporary directory.
+            auto_thresholds (dict, optional): Thresholds of the auto mode overriding
+                DEFAULT_AUTO_THRESHOLDS, such as partition_rows, stream_bytes or spill_bytes.
+            **pool_options: Connection pool and read replica settings forwarded to Config
+                (pool_size, max_overflow, pool_recycle, pool_pre_ping, replica_balancing,
+                replica_max_lag, replica_check_interval).
         """
-        self.config = Config(sql_dir, env_path, verbose) if sql_dir else None
+        self.config = Config(sql_dir, env_path, verbose, **pool_options) if sql_dir else None
+        self.cache = ResultCache(cache_dir, cache_max_bytes, cache_ttl, cache_format, verbose) if cache_dir else None
         self.verbose = verbose
+        self._executor = None
+        self._materialized = {}
+        self._single_flight = SingleFlight(coalesce_window, copy=coalesce_copy) if coalesce else None
+        self.spill = SpillStore(spill_dir, verbose)
+        self.auto_thresholds = resolve_thresholds(auto_thresholds)
+        if verbose:
+            enable_verbose_logging()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def close(self):
+        """
+        Release the pooled database connections and worker threads held by this instance,
+        and remove the files of spilled results.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.spill.close()
+        if self.config:
+            self.config.close()
+
+    async def aclose(self):
+        """
+        Release the async connection pool, pooled database connections, worker threads and spilled results.
+        """
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        self.spill.close()
+        if self.config:
+            await self.config.aclose()
+
+    def add_hook(self, hook):
+        """
+        Register a callable receiving the measurements of every query and command.
+
+        The hook is called with a dict holding the kind, library, SQL, engine, cache status,
+        rows, approximate bytes, pool status, phase timings, total seconds and error.
+
+        Args:
+            hook (callable): Function taking the measurements dict.
+
+        Returns:
+            callable: The hook, so that this method can be used as a decorator.
+        """
+        return self.config.instrumentation.add_hook(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook added with add_hook.
+
+        Args:
+            hook (callable): Hook to remove.
+
+        Returns:
+            bool: True if the hook was removed, False if it was not registered.
+        """
+        return self.config.instrumentation.remove_hook(hook)
+
+    def query_stats(self, reset=False):
+        """
+        Get the aggregated measurements of the queries and commands run so far.
+
+        Args:
+            reset (bool): Flag to discard the measurements after reading them. Default is False.
+
+        Returns:
+            dict: Per library (or 'command'): count, errors, rows, bytes, cache hits, total
+                and mean seconds, p50, p90, p99 and maximum latency, and seconds per phase.
+        """
+        stats = self.config.instrumentation.stats()
+        if reset:
+            self.config.instrumentation.reset()
+        return stats
 
-    def qpd(self, sql):
+    def qpd(self, sql, params=None, dtype_backend=None, cache_ttl=None, optimize_dtypes=False, spill=False,
+            auto=False):
         """
         Execute a SQL query and return the result as a pandas DataFrame.
 
+        By default rows are read through SQLAlchemy. With a dtype_backend the query is
+        fetched as Arrow through ConnectorX and converted with little or no copying.
+
         Args:
             sql (str): SQL query or file name containing the query.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            dtype_backend (str, optional): 'pyarrow' for ArrowDtype columns or 'numpy' for
+                numpy-backed columns read through Arrow. Default is None.
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+                Defaults to the cache_ttl of the instance.
+            optimize_dtypes (bool or dict): Flag to cast columns to the narrowest dtypes allowed by
+                their MySQL types. A dict overrides the 'decimal' type ('float64', 'float32' or
+                'decimal') and the 'category_threshold' of string columns. Default is False.
+            spill (bool): Flag to stream the result into a temporary Arrow IPC file and return
+                a DataFrame of ArrowDtype columns memory-mapped from it, for results larger
+                than memory. Default is False.
+            auto (bool): Flag to choose between a single fetch, a partitioned ConnectorX read, a
+                chunked fetch and spilling from the EXPLAIN estimate of the result, as returned
+                by plan_query. Default is False.
 
         Returns:
             pandas.DataFrame: Result of the query.
         """
-        return self._execute_query(sql, 'pandas')
+        if dtype_backend not in (None, 'numpy', 'pyarrow'):
+            raise ValueError(f"Unsupported dtype backend: {dtype_backend}")
+        return self._execute_query(sql, 'pandas', params=params, cache_ttl=cache_ttl, dtype_backend=dtype_backend,
+                                   optimize_dtypes=optimize_dtypes, spill=spill, auto=auto)
 
-    def qpl(self, sql):
+    def qpl(self, sql, params=None, partition_on=None, partition_num=None, partition_range=None, cache_ttl=None,
+            optimize_dtypes=False, spill=False, auto=False):
         """
         Execute a SQL query and return the result as a polars DataFrame.
 
+        When partition_num is given, ConnectorX splits the read over that many
+        connections in parallel. If partition_on is omitted, the integer primary key
+        of the queried table is used.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query, or a list of
+                queries whose results are read in parallel and concatenated.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+                Defaults to the cache_ttl of the instance.
+            optimize_dtypes (bool or dict): Flag to cast columns to the narrowest dtypes allowed by
+                their MySQL types, with the same rules and options as qpd. Default is False.
+            spill (bool): Flag to stream the result into a temporary Parquet file and return a
+                LazyFrame scanning it, for results larger than memory. The read is not
+                partitioned. Default is False.
+            auto (bool): Flag to choose the partitioning, or spilling, from the EXPLAIN estimate
+                of the result, as returned by plan_query. Default is False.
+
+        Returns:
+            polars.DataFrame: Result of the query, or a polars.LazyFrame when spilled.
+        """
+        return self._execute_query(sql, 'polars', params=params, cache_ttl=cache_ttl, partition_on=partition_on,
+                                   partition_num=partition_num, partition_range=partition_range,
+                                   optimize_dtypes=optimize_dtypes, spill=spill, auto=auto)
+
+    def qar(self, sql, params=None, partition_on=None, partition_num=None, partition_range=None, cache_ttl=None,
+            auto=False):
+        """
+        Execute a SQL query and return the result as a pyarrow Table.
+
+        Accepts the same partitioning arguments as qpl.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query, or a list of
+                queries whose results are read in parallel and concatenated.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+                Defaults to the cache_ttl of the instance.
+            auto (bool): Flag to choose the partitioning, or spilling to a memory-mapped file,
+                from the EXPLAIN estimate of the result. Default is False.
+
+        Returns:
+            pyarrow.Table: Result of the query.
+        """
+        return self._execute_query(sql, 'arrow', params=params, cache_ttl=cache_ttl, partition_on=partition_on,
+                                   partition_num=partition_num, partition_range=partition_range, auto=auto)
+
+    def qdd(self, sql, params=None, index_col=None, npartitions=None, bounds=None,
+            rows_per_partition=DEFAULT_ROWS_PER_PARTITION, cache_ttl=None, optimize_dtypes=False, spill=False,
+            auto=False):
+        """
+        Execute a SQL query and return the result as a lazy dask DataFrame.
+
+        Each partition is a delayed read of one index_col range, so workers only fetch
+        their own slice and the full result is never materialized on the client.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            index_col (str, optional): Integer column used to split the query into ranges.
+                Defaults to the integer primary key of the queried table.
+            npartitions (int, optional): Number of partitions. Defaults to the estimated
+                row count divided by rows_per_partition.
+            bounds (tuple, optional): (min, max) values of index_col. Queried when omitted.
+            rows_per_partition (int): Target number of rows per partition. Default is 250000.
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+                Defaults to the cache_ttl of the instance.
+            optimize_dtypes (bool or dict): Flag to cast columns to the narrowest dtypes allowed by
+                their MySQL types, with the same options as qpd. Only metadata is used, so strings
+                other than ENUM columns are not made categorical. Default is False.
+            spill (bool): Flag to stream the result once into a temporary Parquet file and
+                return a DataFrame reading it, instead of querying the database from every
+                partition. The partitioning arguments are then ignored. Default is False.
+            auto (bool): Flag to spill the result when the EXPLAIN estimate exceeds the spill
+                threshold. Default is False.
+
+        Returns:
+            dask.DataFrame: Result of the query.
+        """
+        return self._execute_query(sql, 'dask', params=params, cache_ttl=cache_ttl, index_col=index_col,
+                                   npartitions=npartitions, bounds=bounds, rows_per_partition=rows_per_partition,
+                                   optimize_dtypes=optimize_dtypes, spill=spill, auto=auto)
+
+    def qpl_incremental(self, sql, snapshot_path, watermark_column, key_columns=None, params=None):
+        """
+        Refresh a local Parquet snapshot of a query with the rows beyond its last watermark.
+
+        The first run fetches the whole query. Later runs only fetch rows whose
+        watermark_column is past the stored watermark and merge them into the snapshot,
+        so a refresh costs in proportion to the size of the change.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            snapshot_path (str): Path of the Parquet snapshot.
+            watermark_column (str): Column whose values only grow, such as updated_at or an auto-increment id.
+            key_columns (str or list, optional): Columns identifying a row. Changed rows replace
+                their previous version in the snapshot. When None, new rows are appended.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            polars.LazyFrame: Scan of the refreshed snapshot, or None if the refresh failed.
+        """
+        pl = importlib.import_module("polars")
+
+        sql_query = self._get_query(sql)
+        if sql_query is None:
+            return None
+        snapshot = Snapshot(snapshot_path, watermark_column, key_columns, self.verbose)
+        try:
+            query = sql_query.strip().rstrip(";")
+            query_params = dict(params or {})
+            watermark = snapshot.load_watermark()
+            if watermark is not None:
+                # With keys, rows sharing the last watermark are fetched again and deduplicated,
+                # so rows committed later within the same timestamp are not missed.
+                operator = ">=" if snapshot.key_columns else ">"
+                column = quote_column(watermark_column)
+                query = f"SELECT * FROM ({query}) AS _squ WHERE {column} {operator} :_squ_watermark"
+                query_params["_squ_watermark"] = watermark
+            if self.verbose:
+                logger.info(f"Refreshing snapshot {snapshot.path} from watermark {watermark!r}")
+            delta = self._run_query(query, 'polars', params=query_params)
+            snapshot.merge(delta)
+            return pl.scan_parquet(snapshot.path)
+        except Exception as e:
+            logger.warning(f"An error occurred while refreshing the snapshot: {e}")
+            return None
+
+    def qlz(self, sql, params=None):
+        """
+        Return a lazy polars LazyFrame backed by a SQL query.
+
+        Nothing is read until the frame is collected. The columns, simple filters and
+        row limit of the polars query are then pushed down into a SQL query wrapping
+        the original one, so only the rows and columns needed are transferred. Filters
+        are always applied again by polars, so unsupported or partially pushed filters
+        still give exact results.
+
         Args:
             sql (str): SQL query or file name containing the query.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            polars.LazyFrame: Lazy scan of the query, or None if the query could not be read.
+        """
+        io_plugins = importlib.import_module("polars.io.plugins")
+
+        sql_query = self._get_query(sql)
+        if sql_query is None:
+            return None
+        query = sql_query.strip().rstrip(";")
+        schema_cache = {}
+
+        def schema():
+            if "schema" not in schema_cache:
+                empty = self._execute_query(f"SELECT * FROM ({query}) AS _squ LIMIT 0", 'polars', raise_errors=True,
+                                            params=params)
+                schema_cache["schema"] = empty.schema
+            return schema_cache["schema"]
+
+        def source(with_columns, predicate, n_rows, batch_size):
+            condition, condition_params, exact = None, {}, True
+            columns = list(with_columns) if with_columns is not None else None
+            if predicate is not None:
+                condition, condition_params, exact = predicate_to_sql(predicate)
+                if columns is not None:
+                    columns += [name for name in predicate.meta.root_names() if name not in columns]
+            if columns == []:
+                # Row counts need a column to carry the number of rows.
+                columns = [next(iter(schema()))]
+
+            select_list = ", ".join(quote_column(column) for column in columns) if columns is not None else "*"
+            pushed = f"SELECT {select_list} FROM ({query}) AS _squ"
+            if condition:
+                pushed += f" WHERE {condition}"
+            if n_rows is not None and exact:
+                pushed += f" LIMIT {int(n_rows)}"
+            logger.info(f"Pushed down lazy query: {pushed}") if self.verbose else None
+            query_params = {**(params or {}), **condition_params} or None
+            df = self._execute_query(pushed, 'polars', raise_errors=True, params=query_params)
+            if predicate is not None:
+                df = df.filter(predicate)
+            if with_columns is not None:
+                df = df.select(with_columns)
+            if n_rows is not None:
+                df = df.head(n_rows)
+            yield df
+
+        return io_plugins.register_io_source(source, schema=schema)
+
+    def qmany(self, queries, library='pandas', max_workers=4, **options):
+        """
+        Execute many independent SQL queries concurrently and return their results.
+
+        Queries run on a thread pool of at most max_workers threads, which bounds the
+        number of concurrent queries on the database. All queries share the pooled
+        connections of this instance. A failing query does not abort the batch.
+
+        Args:
+            queries (list or dict): SQL queries or file names. Results of a dict are keyed
+                by its keys, results of a list by the queries themselves.
+            library (str): Library to use for every query ('pandas', 'polars', 'dask', 'arrow').
+                Default is 'pandas'.
+            max_workers (int): Maximum number of queries running at once. Default is 4.
+            **options: Options forwarded to every query, such as cache_ttl or dtype_backend.
+
+        Returns:
+            tuple: (results, errors) dicts keyed by input. Failed queries map to None in
+                results and to the raised exception in errors.
+        """
+        if library not in LIBRARIES:
+            raise ValueError(f"Unsupported library: {library}")
+        items = dict(queries) if isinstance(queries, dict) else {sql: sql for sql in queries}
+        results, errors = {}, {}
+        if not items:
+            return results, errors
+
+        if self.verbose:
+            logger.info(f"Executing {len(items)} queries with {library} on up to {max_workers} threads.")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            futures = {
+                key: executor.submit(self._execute_query, sql, library, raise_errors=True, **options)
+                for key, sql in items.items()
+            }
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = None
+                    errors[key] = e
+                    logger.warning(f"Query {key!r} failed: {e}")
+        return results, errors
+
+    async def aqpd(self, sql, timeout=None, **options):
+        """
+        Execute a SQL query without blocking the event loop and return a pandas DataFrame.
+
+        Plain queries run on the aiomysql async connection pool. When aiomysql is not
+        installed, when the cache or coalescing is enabled, or when any option other than
+        params is used, the query is offloaded to the managed worker threads instead, so
+        every option of qpd is honored.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            timeout (float, optional): Seconds to wait before raising asyncio.TimeoutError.
+            **options: Options accepted by qpd, such as dtype_backend or cache_ttl.
+
+        Returns:
+            pandas.DataFrame: Result of the query.
+        """
+        plain = not any(value for name, value in options.items() if name != 'params')
+        if plain and self.cache is None and self._single_flight is None and importlib.util.find_spec("aiomysql"):
+            return await asyncio.wait_for(self._execute_with_aiomysql(sql, options.get('params')), timeout)
+        return await self._execute_in_executor(sql, 'pandas', timeout, **options)
+
+    async def aqpl(self, sql, timeout=None, **options):
+        """
+        Execute a SQL query without blocking the event loop and return a polars DataFrame.
+
+        ConnectorX has no async interface, so the query runs on the managed worker threads.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query.
+            timeout (float, optional): Seconds to wait before raising asyncio.TimeoutError.
+            **options: Options accepted by qpl, such as partitioning or cache_ttl.
 
         Returns:
             polars.DataFrame: Result of the query.
         """
-        return self._execute_query(sql, 'polars')
+        return await self._execute_in_executor(sql, 'polars', timeout, **options)
+
+    async def aqar(self, sql, timeout=None, **options):
+        """
+        Execute a SQL query without blocking the event loop and return a pyarrow Table.
+
+        ConnectorX has no async interface, so the query runs on the managed worker threads.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query.
+            timeout (float, optional): Seconds to wait before raising asyncio.TimeoutError.
+            **options: Options accepted by qar, such as partitioning or cache_ttl.
+
+        Returns:
+            pyarrow.Table: Result of the query.
+        """
+        return await self._execute_in_executor(sql, 'arrow', timeout, **options)
 
-    def qdd(self, sql):
+    async def _execute_in_executor(self, sql, library, timeout=None, **options):
         """
-        Execute a SQL query and return the result as a dask DataFrame.
+        Run a query on the managed worker threads and await its result.
+
+        On timeout or cancellation the awaiting task stops immediately, while the worker
+        thread finishes the query in the background and its result is discarded.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query.
+            library (str): Library to use for executing the query.
+            timeout (float, optional): Seconds to wait before raising asyncio.TimeoutError.
+            **options: Library specific options.
+
+        Returns:
+            DataFrame: Result of the query.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.config.pool_size, thread_name_prefix="squ")
+        call = functools.partial(self._execute_query, sql, library, **options)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        return await asyncio.wait_for(future, timeout)
+
+    async def _execute_with_aiomysql(self, sql, params=None):
+        """
+        Execute a SQL query on the aiomysql pool and build a pandas DataFrame.
+
+        The query runs on the pool of a healthy replica when replicas are configured, failing
+        over as run_read does. If the task is cancelled while the query is running, the
+        connection is closed so that it is dropped from the pool instead of being reused mid-query.
 
         Args:
             sql (str): SQL query or file name containing the query.
+            params (dict, optional): Values of the :name bind parameters of the query.
 
         Returns:
-            dask.DataFrame: Result of the query.
+            pandas.DataFrame: Result of the query.
         """
-        return self._execute_query(sql, 'dask')
+        pd = importlib.import_module("pandas")
+
+        sql_query = self._get_query(sql)
+        if sql_query is None:
+            return None
+
+        async def read(host, port):
+            annotate(host=host)
+            with phase("connect"):
+                pool = await self.config.get_async_pool(host, port)
+            async with pool.acquire() as connection:
+                try:
+                    if self.verbose:
+                        logger.info(f"Executing SQL with aiomysql on {host}: {sql_query}")
+                    with phase("execute"):
+                        async with connection.cursor() as cursor:
+                            await cursor.execute(sql_query)
+                            rows = await cursor.fetchall()
+                            return rows, [column[0] for column in cursor.description or ()]
+                except asyncio.CancelledError:
+                    connection.close()
+                    raise
+
+        try:
+            with self.config.instrumentation.trace("query", 'pandas', sql_query) as query_trace:
+                query_trace.engine = "aiomysql"
+                sql_query = render_query(sql_query, params)
+                rows, columns = await self.config.run_read_async(read)
+                with phase("convert"):
+                    result = pd.DataFrame.from_records(list(rows), columns=columns, coerce_float=True)
+                query_trace.rows, query_trace.bytes = result_size(result, 'pandas')
+            return result
+        except Exception as e:
+            logger.warning(f"An error occurred while executing the query with aiomysql: {e}")
+            return None
 
-    def _execute_query(self, sql, library):
+    def qpd_iter(self, sql, params=None, chunksize=DEFAULT_CHUNKSIZE):
         """
-        Execute a SQL query using the specified library.
+        Execute a SQL query and yield the result as pandas DataFrames of at most chunksize rows.
+
+        Rows are streamed through an unbuffered server-side cursor, so memory use stays
+        bounded by the chunk size regardless of the size of the result.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            chunksize (int): Maximum number of rows per DataFrame. Default is 10000.
+
+        Returns:
+            Iterator[pandas.DataFrame]: Chunks of the result.
+        """
+        return self._iter_query(sql, 'pandas', chunksize, params)
+
+    def qpl_iter(self, sql, params=None, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Execute a SQL query and yield the result as polars DataFrames of at most chunksize rows.
+
+        Rows are streamed through an unbuffered server-side cursor, so memory use stays
+        bounded by the chunk size regardless of the size of the result.
 
         Args:
             sql (str): SQL query or file name containing the query.
-            library (str): Library to use for executing the query ('pandas', 'polars', 'dask').
+            params (dict, optional): Values of the :name bind parameters of the query.
+            chunksize (int): Maximum number of rows per DataFrame. Default is 10000.
+
+        Returns:
+            Iterator[polars.DataFrame]: Chunks of the result.
+        """
+        return self._iter_query(sql, 'polars', chunksize, params)
+
+    def _iter_query(self, sql, library, chunksize, params=None):
+        """
+        Stream a SQL query in chunks using the specified library.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            library (str): Library used to build each chunk ('pandas', 'polars').
+            chunksize (int): Maximum number of rows per chunk.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            Iterator[DataFrame]: Chunks of the result, empty if the query could not be read.
+        """
+        if library not in ('pandas', 'polars'):
+            raise ValueError(f"Unsupported library for streaming: {library}")
+        sql_query = self._get_query(sql)
+        if sql_query is None:
+            return iter(())
+        # The endpoint is picked once, so a stream stays on the replica it started on.
+        db_url = self.config.run_read(lambda host, port: self.config.create_mysql_uri("pymysql", host, port))
+        return self._stream_chunks(db_url, sql_query, library, chunksize, params)
+
+    def _stream_chunks(self, db_url, sql_query, library, chunksize, params=None):
+        """
+        Generator yielding chunks of a query read through a server-side cursor.
+
+        If the consumer stops iterating early, the connection is invalidated rather than
+        drained, which aborts the transfer and keeps the half-read connection out of the pool.
+        Errors are raised to the consumer instead of silently truncating the stream.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str): SQL query to execute.
+            library (str): Library used to build each chunk ('pandas', 'polars').
+            chunksize (int): Maximum number of rows per chunk.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Yields:
+            DataFrame: Chunk of the result.
+        """
+        from sqlalchemy import text
+
+        build_chunk = _frame_builder(library)
+        if self.verbose:
+            logger.info(f"Streaming SQL with {library} in chunks of {chunksize}: {sql_query}")
+        connection = self.config.get_engine(db_url).connect()
+        exhausted = False
+        try:
+            connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+            result = connection.execute(text(sql_query), params or {})
+            columns = list(result.keys())
+            for rows in result.partitions(chunksize):
+                yield build_chunk(rows, columns)
+            exhausted = True
+        finally:
+            if not exhausted:
+                connection.invalidate()
+                logger.info("Streaming stopped early; connection invalidated.") if self.verbose else None
+            connection.close()
+
+    def qscript(self, sql, library='pandas', params=None):
+        """
+        Execute a multi-statement SQL script on one session and return every result set.
+
+        The statements run in order on a single pinned connection inside one transaction,
+        so temporary tables and session variables created by a statement are visible to
+        the following ones. The connection is discarded afterwards instead of being returned
+        to the pool, so that session state never leaks into later queries.
+
+        Args:
+            sql (str): SQL script or file name containing it. Statements are separated by
+                semicolons, or by the terminator set with a DELIMITER line.
+            library (str): Library of the result sets ('pandas', 'polars'). Default is 'pandas'.
+            params (dict, optional): Values of the :name bind parameters, shared by every statement.
+
+        Returns:
+            list: One DataFrame per statement returning rows, in order, or None if the script failed.
+        """
+        if library not in ('pandas', 'polars'):
+            raise ValueError(f"Unsupported library for scripts: {library}")
+        from sqlalchemy import text
+
+        script = self._get_query(sql)
+        if script is None:
+            return None
+        statements = split_statements(script)
+        build_frame = _frame_builder(library)
+        db_url = self.config.create_mysql_uri("pymysql")
+        try:
+            with self.config.instrumentation.trace("query", library, script) as query_trace:
+                query_trace.engine = "sqlalchemy"
+                with phase("connect"):
+                    connection = self.config.get_engine(db_url).connect()
+                try:
+                    results = []
+                    with connection.begin():
+                        for statement in statements:
+                            if self.verbose:
+                                logger.info(f"Executing script statement: {statement}")
+                            result = connection.execute(text(statement), params or {})
+                            if result.returns_rows:
+                                columns = list(result.keys())
+                                rows = result.fetchall()
+                                with phase("convert"):
+                                    results.append(build_frame(rows, columns))
+                finally:
+                    connection.invalidate()
+                    connection.close()
+                query_trace.rows = sum(len(frame) for frame in results)
+            return results
+        except Exception as e:
+            logger.warning(f"An error occurred while executing the script with {library}: {e}")
+            return None
+
+    def invalidate_cache(self, sql, params=None, optimize_dtypes=False):
+        """
+        Remove the cached result of a query.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query.
+            params (dict, optional): Bind parameters the result was cached with.
+            optimize_dtypes (bool or dict): Dtype optimization the result was cached with. Default is False.
+
+        Returns:
+            bool: True if a cached result was removed, False otherwise.
+        """
+        sql_query = self._get_queries(sql)
+        if self.cache is None or sql_query is None:
+            return False
+        key = self.cache.make_key(sql_query, self.config.target, params, dtype_options(optimize_dtypes))
+        return self.cache.invalidate(key)
+
+    def clear_cache(self):
+        """
+        Remove every cached result.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _execute_query(self, sql, library, cache_ttl=None, raise_errors=False, **options):
+        """
+        Execute a SQL query using the specified library.
+
+        Args:
+            sql (str or list): SQL query or file name containing the query. Lists of
+                queries are only supported by the ConnectorX based libraries.
+            library (str): Library to use for executing the query ('pandas', 'polars', 'dask', 'arrow').
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+            raise_errors (bool): Flag to raise errors instead of returning None. Default is False.
+            **options: Library specific options, such as partitioning for polars and arrow.
 
         Returns:
             DataFrame: Result of the query.
         """
+        if library not in LIBRARIES:
+            raise ValueError(f"Unsupported library: {library}")
+        if 'optimize_dtypes' in options:
+            options['optimize_dtypes'] = dtype_options(options['optimize_dtypes'])
+        if options.get('spill') and options.get('optimize_dtypes'):
+            raise ValueError("optimize_dtypes is not supported with spill")
+        auto = options.pop('auto', False)
+        sql_query = self._get_queries(sql)
+        if sql_query is None:
+            if raise_errors:
+                raise ValueError(f"Invalid SQL query or file: {sql}")
+            return None
+        if (options.get('spill') or auto) and isinstance(sql_query, list):
+            raise ValueError("Lists of queries cannot be spilled or planned")
+
+        def execute():
+            return self._execute_cached(sql_query, library, cache_ttl, auto, **options)
+
+        try:
+            with self.config.instrumentation.trace("query", library, sql_query) as query_trace:
+                if self._single_flight is None:
+                    result = execute()
+                else:
+                    key = ResultCache.make_key(sql_query, self.config.target, options.get('params'),
+                                               {"library": library, "auto": auto, **options})
+                    result, query_trace.coalesced = self._single_flight.do(key, execute, library)
+                if result is not None:
+                    rows, query_trace.bytes = result_size(result, library)
+                    query_trace.rows = rows if rows is not None else query_trace.rows
+                return result
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"An error occurred while executing the query with {library}: {e}")
+            return None
+
+    def plan_query(self, sql, library='pandas', params=None, dtype_backend=None):
+        """
+        Estimate the result of a query and choose how the auto mode would read it.
+
+        The rows come from the optimizer's EXPLAIN output and the row width from the
+        average row lengths information_schema reports for the tables of the plan. The
+        estimate is compared with auto_thresholds to pick one of 'single', 'partitioned'
+        (parallel ConnectorX connections), 'stream' (chunked fetch) or 'spill'.
+
+        Args:
+            sql (str): SQL query or file name containing the query.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow'). Default is 'pandas'.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            dtype_backend (str, optional): dtype_backend of a pandas read, which only ConnectorX
+                reads can be partitioned for.
+
+        Returns:
+            dict: Estimated 'rows', 'row_bytes', 'bytes' and the 'tables' with statistics, the
+                chosen 'strategy', the 'reason' for it and the query 'options' implementing it,
+                or None if the query could not be explained.
+        """
+        if library not in LIBRARIES:
+            raise ValueError(f"Unsupported library: {library}")
         sql_query = self._get_query(sql)
         if sql_query is None:
             return None
+        explain_rows = self.config.explain_query(sql_query, params)
+        if not explain_rows:
+            return None
+        tables = [row["table"] for row in explain_rows
+                  if row.get("id") in (1, None) and row.get("table") and not row["table"].startswith("<")]
+        thresholds = self.auto_thresholds
+        estimate = estimate_result(explain_rows, self.config.table_statistics(tables),
+                                   thresholds["default_row_bytes"])
+        partition_on = None
+        partitionable = library in ('polars', 'arrow') or (library == 'pandas' and dtype_backend)
+        if partitionable and estimate["rows"] >= thresholds["partition_rows"]:
+            partition_on = self._detect_partition_column(sql_query)
+        plan = {**estimate, **choose_strategy(estimate, library, thresholds, partition_on, dtype_backend)}
+        if self.verbose:
+            logger.info(f"Planned {plan['strategy']} read for {library} ({plan['reason']}): {sql_query}")
+        return plan
 
-        if library == 'pandas':
-            db_url = self.config.create_mysql_uri("pymysql")
-            return self._execute_with_pandas(db_url, sql_query)
+    def _auto_options(self, sql_query, library, options):
+        """
+        Fill in the read options of a query chosen by plan_query.
+
+        Options the caller set, such as a dtype_backend or partitioning, are kept, and the
+        plan only fills in the ones left unset.
+
+        Args:
+            sql_query (str): SQL query to plan.
+            library (str): Library of the result.
+            options (dict): Options of the query.
+
+        Returns:
+            dict: Options implementing the chosen strategy, or the given options if the
+                query could not be planned.
+        """
+        with phase("estimate"):
+            plan = self.plan_query(sql_query, library, options.get('params'), options.get('dtype_backend'))
+        if plan is None:
+            logger.warning("The query could not be planned; reading it with the given options.")
+            return options
+        strategy, plan_options = plan["strategy"], plan["options"]
+        annotate(strategy=strategy)
+        run_options = dict(options)
+        for name, value in plan_options.items():
+            if not options.get(name):
+                run_options[name] = value
+        if strategy == 'spill' and run_options.get('optimize_dtypes'):
+            logger.info("Spilling the result without optimize_dtypes.") if self.verbose else None
+            run_options['optimize_dtypes'] = None
+        return run_options
+
+    def _execute_cached(self, sql_query, library, cache_ttl=None, auto=False, **options):
+        """
+        Execute a SQL query, serving it from the result cache when enabled.
+
+        With auto, the query is planned only when it is not served from the cache, so cache
+        hits never reach the database. Spilled results are already on disk and bypass the cache.
+
+        Args:
+            sql_query (str or list): SQL query or list of queries.
+            library (str): Library to use for executing the query.
+            cache_ttl (float, optional): Time to live of the cached result in seconds.
+            auto (bool): Flag to choose the read options with plan_query. Default is False.
+            **options: Library specific options.
+
+        Returns:
+            DataFrame: Result of the query.
+        """
+        use_cache = self.cache is not None and not options.get('spill')
+        if use_cache:
+            key = self.cache.make_key(sql_query, self.config.target, options.get('params'),
+                                      options.get('optimize_dtypes'))
+            with phase("cache_lookup"):
+                path = self.cache.get(key)
+            if path is not None:
+                annotate(engine="cache", cache="hit")
+                with phase("cache_load"):
+                    return self.cache.load(path, library, options.get('dtype_backend'))
+            annotate(cache="miss")
+
+        run_options = self._auto_options(sql_query, library, options) if auto else options
+        result = self._run_query(sql_query, library, **run_options)
+        if not use_cache or run_options.get('spill') or result is None:
+            return result
+        try:
+            with phase("cache_store"):
+                path = self.cache.put(key, result, library, cache_ttl)
+        except Exception as e:
+            logger.warning(f"An error occurred while caching the result: {e}")
+            return result
+        return self.cache.load(path, library) if library == 'dask' else result
+
+    def _run_query(self, sql_query, library, optimize_dtypes=None, **options):
+        """
+        Run a SQL query against the database using the specified library.
+
+        Args:
+            sql_query (str or list): SQL query or list of queries.
+            library (str): Library to use for executing the query ('pandas', 'polars', 'dask', 'arrow').
+            optimize_dtypes (dict, optional): Dtype mapping options, or None to keep the default dtypes.
+            **options: Library specific options.
+
+        Returns:
+            DataFrame: Result of the query.
+        """
+        result = self.config.run_read(lambda host, port: self._read_from(host, port, sql_query, library, **options))
+        if optimize_dtypes and result is not None:
+            with phase("optimize"):
+                result = self._optimize_dtypes(result, sql_query, library, optimize_dtypes, options.get('params'))
+        return result
+
+    def _read_from(self, host, port, sql_query, library, spill=False, chunksize=None, **options):
+        """
+        Read a SQL query from one database host using the specified library.
+
+        Args:
+            host (str): Host to read from, the primary or a replica.
+            port (str): Port of the host.
+            sql_query (str or list): SQL query or list of queries.
+            library (str): Library to use for executing the query ('pandas', 'polars', 'dask', 'arrow').
+            spill (bool): Flag to stream the result to a temporary file instead of memory. Default is False.
+            chunksize (int, optional): Fetch pandas or polars results through a server-side cursor
+                in chunks of this many rows. Default is None (single fetch).
+            **options: Library specific options.
+
+        Returns:
+            DataFrame: Result of the query.
+        """
+        annotate(host=host)
+        if spill:
+            db_url = self.config.create_connectorx_uri(host, port)
+            annotate(engine="connectorx")
+            return self._execute_with_spill(db_url, sql_query, library, options.get('params'))
+        if chunksize and library in ('pandas', 'polars'):
+            db_url = self.config.create_mysql_uri("pymysql", host, port)
+            annotate(engine="sqlalchemy")
+            return self._execute_streamed(db_url, sql_query, library, chunksize, options.get('params'))
+        if library == 'pandas' and options.get('dtype_backend'):
+            db_url = self.config.create_connectorx_uri(host, port)
+            annotate(engine="connectorx")
+            return self._execute_with_pandas_arrow(db_url, sql_query, **options)
+        elif library == 'pandas':
+            db_url = self.config.create_mysql_uri("pymysql", host, port)
+            annotate(engine="sqlalchemy")
+            result = self._execute_with_pandas(db_url, sql_query, options.get('params'))
+            annotate(pool=self.config.pool_status(db_url))
+            return result
         elif library == 'polars':
-            db_url = self.config.create_connectorx_uri()
-            return self._execute_with_polars(db_url, sql_query)
-        elif library == 'dask':
-            db_url = self.config.create_mysql_uri("pymysql")
-            return self._execute_with_dask(db_url, sql_query)
+            db_url = self.config.create_connectorx_uri(host, port)
+            annotate(engine="connectorx")
+            return self._execute_with_polars(db_url, sql_query, **options)
+        elif library == 'arrow':
+            db_url = self.config.create_connectorx_uri(host, port)
+            annotate(engine="connectorx")
+            return self._execute_with_arrow(db_url, sql_query, **options)
         else:
-            raise ValueError(f"Unsupported library: {library}")
+            db_url = self.config.create_mysql_uri("pymysql", host, port)
+            annotate(engine="dask")
+            with phase("plan"):
+                return self._execute_with_dask(db_url, sql_query, **options)
+
+    def _optimize_dtypes(self, result, sql_query, library, options, params=None):
+        """
+        Cast a query result to the narrowest dtypes allowed by the MySQL types of its columns.
+
+        The column types are read from the metadata of a LIMIT 0 probe of the query. Dask
+        partitions are cast lazily, one partition at a time, from the same metadata.
+
+        Args:
+            result (DataFrame): Result of the query.
+            sql_query (str or list): SQL query or list of queries that produced the result.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+            options (dict): Dtype mapping options.
+            params (dict, optional): Values of the :name bind parameters of the query.
 
-    def _execute_with_pandas(self, db_url, sql_query):
+        Returns:
+            DataFrame: Result with optimized dtypes, or the result unchanged if the query could not be described.
+        """
+        fields = self.config.describe_query(sql_query[0] if isinstance(sql_query, list) else sql_query, params)
+        if not fields:
+            return result
+        kinds = column_kinds(fields)
+        if library == 'pandas':
+            return optimize_pandas(result, kinds, options)
+        if library == 'polars':
+            return optimize_polars(result, kinds, options)
+        if library == 'dask':
+            dd_utils = importlib.import_module("dask.dataframe.utils")
+            meta = optimize_pandas(result._meta.copy(), kinds, options, detect_categories=False)
+            return result.map_partitions(optimize_pandas, kinds, options, False,
+                                         meta=dd_utils.clear_known_categories(meta))
+        return result
+
+    def _execute_with_pandas(self, db_url, sql_query, params=None):
         """
         Execute a SQL query using pandas.
 
         Args:
             db_url (str): Database URL.
             sql_query (str): SQL query to execute.
+            params (dict, optional): Values of the :name bind parameters of the query.
 
         Returns:
             pandas.DataFrame: Result of the query.
         """
         pd = importlib.import_module("pandas")
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import text
 
-        try:
-            engine = create_engine(db_url)
-            sql_query = text(sql_query)
-            if self.verbose:
-                print(f"Executing SQL with pandas: {sql_query}")
-            with engine.connect() as connection:
-                df = pd.read_sql_query(sql_query, connection)
-            return df
-        except Exception as e:
-            print(f"An error occurred while executing the query with pandas: {e}") if self.verbose else None
-            return None
+        engine = self.config.get_engine(db_url)
+        sql_query = text(sql_query)
+        if self.verbose:
+            logger.info(f"Executing SQL with pandas: {sql_query}")
+        with phase("connect"):
+            connection = engine.connect()
+        with connection:
+            # Time spent in cursor.execute is recorded as its own phase by the engine listeners.
+            with phase("convert"):
+                df = pd.read_sql_query(sql_query, connection, params=params)
+        return df
 
-    def _execute_with_polars(self, db_url, sql_query):
+    def _execute_with_pandas_arrow(self, db_url, sql_query, dtype_backend, params=None, partition_on=None,
+                                   partition_num=None, partition_range=None):
         """
-        Execute a SQL query using polars.
+        Execute a SQL query with ConnectorX into Arrow and convert the table to pandas.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str): SQL query to execute.
+            dtype_backend (str): 'pyarrow' for zero-copy ArrowDtype columns, 'numpy' for
+                numpy-backed columns.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
+
+        Returns:
+            pandas.DataFrame: Result of the query.
+        """
+        if self.verbose:
+            logger.info(f"Executing SQL with pandas through arrow ({dtype_backend}): {sql_query}")
+        with phase("fetch"):
+            table = self._read_with_connectorx(db_url, sql_query, "arrow", params, partition_on, partition_num,
+                                                partition_range)
+        with phase("convert"):
+            return arrow_to_pandas(table, dtype_backend)
+
+    def _execute_streamed(self, db_url, sql_query, library, chunksize, params=None):
+        """
+        Fetch a SQL query in chunks through a server-side cursor and concatenate them.
+
+        The driver never holds more than a chunk of rows as Python objects, which bounds the
+        transient memory of large pandas reads to the size of the result plus one chunk.
 
         Args:
             db_url (str): Database URL.
             sql_query (str): SQL query to execute.
+            library (str): Library of the result ('pandas', 'polars').
+            chunksize (int): Maximum number of rows per chunk.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            DataFrame: Result of the query.
+        """
+        from sqlalchemy import text
+
+        build_frame = _frame_builder(library)
+        if self.verbose:
+            logger.info(f"Executing SQL with {library} in chunks of {chunksize}: {sql_query}")
+        with phase("connect"):
+            connection = self.config.get_engine(db_url).connect()
+        with connection:
+            connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+            result = connection.execute(text(sql_query), params or {})
+            columns = list(result.keys())
+            with phase("fetch"):
+                chunks = [build_frame(rows, columns) for rows in result.partitions(chunksize)]
+        if not chunks:
+            return build_frame([], columns)
+        with phase("convert"):
+            if library == 'pandas':
+                return importlib.import_module("pandas").concat(chunks, ignore_index=True)
+            return importlib.import_module("polars").concat(chunks, how="vertical_relaxed")
+
+    def _execute_with_polars(self, db_url, sql_query, params=None, partition_on=None, partition_num=None,
+                            partition_range=None):
+        """
+        Execute a SQL query using polars.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str or list): SQL query or list of queries to execute.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
 
         Returns:
             polars.DataFrame: Result of the query.
         """
         pl = importlib.import_module("polars")
+
+        if self.verbose:
+            logger.info(f"Executing SQL with polars: {sql_query}")
+        with phase("fetch"):
+            df = self._read_with_connectorx(db_url, sql_query, "polars", params, partition_on, partition_num,
+                                             partition_range)
+        return df
+
+    def _execute_with_arrow(self, db_url, sql_query, params=None, partition_on=None, partition_num=None,
+                           partition_range=None):
+        """
+        Execute a SQL query using pyarrow.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str or list): SQL query or list of queries to execute.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
+
+        Returns:
+            pyarrow.Table: Result of the query.
+        """
+        pa = importlib.import_module("pyarrow")
+
+        if self.verbose:
+            logger.info(f"Executing SQL with arrow: {sql_query}")
+        with phase("fetch"):
+            table = self._read_with_connectorx(db_url, sql_query, "arrow", params, partition_on, partition_num,
+                                                partition_range)
+        return table
+
+    def _execute_with_spill(self, db_url, sql_query, library, params=None, chunksize=DEFAULT_SPILL_CHUNKSIZE):
+        """
+        Stream a SQL query into a temporary file and return a frame backed by it.
+
+        ConnectorX yields the rows as Arrow record batches of at most chunksize rows, which
+        are appended to the file one at a time, so memory use is bounded by the batch size.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str): SQL query to execute.
+            library (str): Library of the result ('pandas', 'polars', 'dask', 'arrow').
+            params (dict, optional): Values of the :name bind parameters of the query.
+            chunksize (int): Maximum number of rows per batch. Default is 100000.
+
+        Returns:
+            DataFrame: Lazy or memory-mapped result, as returned by SpillStore.spill.
+        """
         cx = importlib.import_module("connectorx")
 
-        try:
-            if self.verbose:
-                print(f"Executing SQL with polars: {sql_query}")
-            df = cx.read_sql(db_url, sql_query, return_type="polars")
-            return df
-        except Exception as e:
-            print(f"An error occurred while executing the query with polars: {e}") if self.verbose else None
+        if self.verbose:
+            logger.info(f"Spilling SQL with {library} to {self.spill.directory}: {sql_query}")
+        with phase("fetch"):
+            reader = cx.read_sql(db_url, render_query(sql_query, params).strip().rstrip(";"),
+                                 return_type="arrow_stream", batch_size=chunksize)
+            result, rows = self.spill.spill(reader, library)
+        annotate(rows=rows)
+        return result
+
+    def _read_with_connectorx(self, db_url, sql_query, return_type, params=None, partition_on=None,
+                              partition_num=None, partition_range=None):
+        """
+        Read a query with ConnectorX, splitting it into parallel partitions when requested.
+
+        ConnectorX has no bind parameter support, so parameters are inlined as escaped literals.
+
+        Args:
+            db_url (str): Database URL.
+            sql_query (str or list): SQL query or list of queries to execute.
+            return_type (str): ConnectorX return type ('polars', 'arrow', 'pandas').
+            params (dict, optional): Values of the :name bind parameters of the query.
+            partition_on (str, optional): Integer column used to split the read.
+            partition_num (int, optional): Number of partitions to read in parallel.
+            partition_range (tuple, optional): (min, max) bounds of partition_on.
+
+        Returns:
+            DataFrame: Result of the query in the requested return type.
+        """
+        cx = importlib.import_module("connectorx")
+
+        if isinstance(sql_query, list):
+            queries = [render_query(query, params).strip().rstrip(";") for query in sql_query]
+            return cx.read_sql(db_url, queries, return_type=return_type)
+
+        sql_query = render_query(sql_query, params)
+        if partition_num and not partition_on:
+            partition_on = self._detect_partition_column(sql_query)
+        if not partition_on:
+            return cx.read_sql(db_url, sql_query, return_type=return_type)
+
+        partition_options = {
+            "partition_on": partition_on,
+            "partition_num": partition_num or os.cpu_count() or 1,
+        }
+        if partition_range:
+            partition_options["partition_range"] = tuple(partition_range)
+        if self.verbose:
+            logger.info(f"Reading with ConnectorX partitioning: {partition_options}")
+        return cx.read_sql(db_url, sql_query.strip().rstrip(";"), return_type=return_type, **partition_options)
+
+    def _detect_partition_column(self, sql_query):
+        """
+        Pick a partition column from the integer primary key of the queried table.
+
+        Only simple single-table queries whose select list exposes the key are considered.
+        Queries whose result depends on seeing every row at once, because they join, order,
+        limit, group, aggregate, deduplicate or combine results, are never partitioned.
+
+        Args:
+            sql_query (str): SQL query to inspect.
+
+        Returns:
+            str: Name of the partition column, or None if none could be determined.
+        """
+        match = _SOURCE_TABLE_RE.match(sql_query.strip().rstrip(";"))
+        if (not match or _UNPARTITIONABLE_REST_RE.search(match.group("rest"))
+                or _UNPARTITIONABLE_COLUMNS_RE.search(match.group("columns"))):
+            return None
+        column = self.config.get_integer_primary_key(match.group("table"))
+        if not column:
             return None
+        columns = match.group("columns")
+        if columns.strip() != "*" and not re.search(rf"(?<!\w){re.escape(column)}\b|`{re.escape(column)}`", columns):
+            return None
+        return column
 
-    def _execute_with_dask(self, db_url, sql_query):
+    def _execute_with_dask(self, db_url, sql_query, params=None, index_col=None, npartitions=None, bounds=None,
+                           rows_per_partition=DEFAULT_ROWS_PER_PARTITION):
         """
         Execute a SQL query using dask.
 
+        The meta holds the dtypes read_sql_query gives the first row of the query, with the
+        columns that row leaves undecided (an empty result or NULL values) typed from the
+        column metadata of the query. Partitions are cast to it where their dtypes differ.
+
         Args:
             db_url (str): Database URL.
             sql_query (str): SQL query to execute.
+            params (dict, optional): Values of the :name bind parameters of the query.
+            index_col (str, optional): Integer column used to split the query into ranges.
+            npartitions (int, optional): Number of partitions.
+            bounds (tuple, optional): (min, max) values of index_col.
+            rows_per_partition (int): Target number of rows per partition.
 
         Returns:
             dask.DataFrame: Result of the query.
         """
         dd = importlib.import_module("dask.dataframe")
-        pd = importlib.import_module("pandas")
-        from sqlalchemy import create_engine, text
+        dask = importlib.import_module("dask")
+
+        query = sql_query.strip().rstrip(";")
+        if index_col is None:
+            index_col = self._detect_partition_column(query)
+        partition_queries = self._build_partition_queries(query, index_col, npartitions, bounds, rows_per_partition,
+                                                          params)
+        if self.verbose:
+            logger.info(f"Executing SQL with dask in {len(partition_queries)} partition(s): {query}")
+        sample = _read_sql_partition(self.config, db_url, f"SELECT * FROM ({query}) AS _squ LIMIT 1", params)
+        meta = sample.iloc[:0]
+        undecided = [column for column in sample.columns if sample[column].isna().all()]
+        fields = self.config.describe_query(query, params) if undecided else None
+        if fields:
+            dtypes = pandas_dtypes(fields)
+            meta = meta.astype({column: dtypes[column] for column in undecided if column in dtypes})
+        read_partition = dask.delayed(_read_sql_partition, pure=True)
+        # Partitions pick their replica when computed, so a replica failing after planning is failed over.
+        parts = [read_partition(self.config, None, partition_query, params, meta)
+                 for partition_query in partition_queries]
+        dask_df = dd.from_delayed(parts, meta=meta)
+        return dask_df
+
+    def _build_partition_queries(self, query, index_col, npartitions, bounds, rows_per_partition, params=None):
+        """
+        Split a query into one query per index_col range.
+
+        The first and last ranges are open ended and the first also holds NULL keys,
+        so every row lands in exactly one partition whatever the bounds.
+
+        Args:
+            query (str): SQL query without a trailing semicolon.
+            index_col (str): Integer column used to split the query, or None for a single partition.
+            npartitions (int): Number of partitions, or None to derive it from the row estimate.
+            bounds (tuple): (min, max) values of index_col, or None to query them.
+            rows_per_partition (int): Target number of rows per partition.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            list: SQL queries, one per partition.
+        """
+        if not index_col or npartitions == 1:
+            return [query]
+        if npartitions is None:
+            estimate = self.config.estimate_rows(query, params)
+            npartitions = max(1, math.ceil((estimate or 0) / rows_per_partition))
+            if npartitions == 1:
+                return [query]
+        column = quote_column(index_col)
+        if bounds is None:
+            rows = self.config.fetch_rows(f"SELECT MIN({column}), MAX({column}) FROM ({query}) AS _squ", params)
+            bounds = rows[0] if rows else (None, None)
+        low, high = bounds
+        if low is None or high is None:
+            return [query]
+        low, high = int(low), int(high)
+        npartitions = max(1, min(npartitions, high - low + 1))
+        edges = [low + (high - low + 1) * i // npartitions for i in range(1, npartitions)]
+        if not edges:
+            return [query]
+        queries = [f"SELECT * FROM ({query}) AS _squ WHERE {column} < {edges[0]} OR {column} IS NULL"]
+        for lower, upper in zip(edges, edges[1:]):
+            queries.append(f"SELECT * FROM ({query}) AS _squ WHERE {column} >= {lower} AND {column} < {upper}")
+        queries.append(f"SELECT * FROM ({query}) AS _squ WHERE {column} >= {edges[-1]}")
+        return queries
+
+    def wpd(self, df, table_name, mode='append', method='auto', batch_bytes=DEFAULT_BATCH_BYTES):
+        """
+        Write a pandas DataFrame into an existing table.
+
+        Args:
+            df (pandas.DataFrame): Data to write. Column names must match the table.
+            table_name (str): Destination table.
+            mode (str): 'append', 'replace' or 'upsert'. Default is 'append'.
+            method (str): 'auto', 'infile' or 'executemany'. Default is 'auto'.
+            batch_bytes (int): Maximum size in bytes of each multi-row INSERT. Default is 4 MiB.
+
+        Returns:
+            dict: Rows written, seconds and rows per second, or None if the write failed.
+        """
+        return self._write_frame(df, 'pandas', table_name, mode, method, batch_bytes)
+
+    def wpl(self, df, table_name, mode='append', method='auto', batch_bytes=DEFAULT_BATCH_BYTES):
+        """
+        Write a polars DataFrame into an existing table.
+
+        Args:
+            df (polars.DataFrame): Data to write. Column names must match the table.
+            table_name (str): Destination table.
+            mode (str): 'append', 'replace' or 'upsert'. Default is 'append'.
+            method (str): 'auto', 'infile' or 'executemany'. Default is 'auto'.
+            batch_bytes (int): Maximum size in bytes of each multi-row INSERT. Default is 4 MiB.
+
+        Returns:
+            dict: Rows written, seconds and rows per second, or None if the write failed.
+        """
+        return self._write_frame(df, 'polars', table_name, mode, method, batch_bytes)
+
+    def war(self, table, table_name, mode='append', method='auto', batch_bytes=DEFAULT_BATCH_BYTES):
+        """
+        Write a pyarrow Table into an existing table.
+
+        Args:
+            table (pyarrow.Table): Data to write. Column names must match the table.
+            table_name (str): Destination table.
+            mode (str): 'append', 'replace' or 'upsert'. Default is 'append'.
+            method (str): 'auto', 'infile' or 'executemany'. Default is 'auto'.
+            batch_bytes (int): Maximum size in bytes of each multi-row INSERT. Default is 4 MiB.
+
+        Returns:
+            dict: Rows written, seconds and rows per second, or None if the write failed.
+        """
+        return self._write_frame(table, 'arrow', table_name, mode, method, batch_bytes)
+
+    def _write_frame(self, data, library, table_name, mode, method, batch_bytes):
+        """
+        Write data into a table with the BulkWriter.
+
+        Args:
+            data (DataFrame): Data to write.
+            library (str): Library of the data ('pandas', 'polars', 'arrow').
+            table_name (str): Destination table.
+            mode (str): 'append', 'replace' or 'upsert'.
+            method (str): 'auto', 'infile' or 'executemany'.
+            batch_bytes (int): Maximum size in bytes of each multi-row INSERT.
 
+        Returns:
+            dict: Write statistics, or None if the write failed.
+        """
+        writer = BulkWriter(self.config, self.verbose)
         try:
-            engine = create_engine(db_url)
-            sql_query = text(sql_query)
-            if self.verbose:
-                print(f"Executing SQL with dask: {sql_query}")
-            with engine.connect() as connection:
-                df = pd.read_sql_query(sql_query, connection)
-            dask_df = dd.from_pandas(df, npartitions=4)
-            return dask_df
+            return writer.write(data, library, table_name, mode, method, batch_bytes)
+        except ValueError:
+            raise
         except Exception as e:
-            print(f"An error occurred while executing the query with dask: {e}") if self.verbose else None
+            logger.warning(f"An error occurred while writing to {table_name}: {e}")
             return None
 
     def cvw(self, view_name, sql):
@@ -175,17 +1503,17 @@ class SQU:
         """
         select_query = self._get_query(sql)
         if select_query is None:
-            print(f"Failed to read the SQL file or invalid query: {sql}") if self.verbose else None
+            logger.warning(f"Failed to read the SQL file or invalid query: {sql}")
             return False
 
         create_view_sql = f"CREATE OR REPLACE VIEW {view_name} AS {select_query}"
         if self.verbose:
-            print(f"Creating view with SQL: {create_view_sql}")
+            logger.info(f"Creating view with SQL: {create_view_sql}")
         success = self.config.execute_sql(create_view_sql, use_sqlalchemy=False)
         if success:
-            print(f"View '{view_name}' created successfully.") if self.verbose else None
+            logger.info(f"View '{view_name}' created successfully.") if self.verbose else None
         else:
-            print(f"Failed to create view '{view_name}'.") if self.verbose else None
+            logger.warning(f"Failed to create view '{view_name}'.")
         return success
 
     def dvw(self, view_name):
@@ -200,14 +1528,169 @@ class SQU:
         """
         drop_view_sql = f"DROP VIEW IF EXISTS {view_name}"
         if self.verbose:
-            print(f"Dropping view with SQL: {drop_view_sql}")
+            logger.info(f"Dropping view with SQL: {drop_view_sql}")
         success = self.config.execute_sql(drop_view_sql, use_sqlalchemy=False)
         if success:
-            print(f"View '{view_name}' deleted successfully.") if self.verbose else None
+            logger.info(f"View '{view_name}' deleted successfully.") if self.verbose else None
+        else:
+            logger.warning(f"Failed to delete view '{view_name}'.")
+        return success
+
+    def cmt(self, table_name, sql, primary_key=None, params=None):
+        """
+        Create or rebuild a materialized summary table from a SQL query.
+
+        The table is built under a shadow name and swapped in with a single atomic
+        RENAME TABLE, so readers of the previous version are never blocked.
+
+        Args:
+            table_name (str): Name of the table to materialize.
+            sql (str): SQL query or file name containing the query that defines the table.
+            primary_key (str or list, optional): Primary key columns of the table, required
+                for incremental refreshes that update existing rows.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            bool: True if the table was materialized successfully, False otherwise.
+        """
+        select_query = self._get_query(sql)
+        if select_query is None:
+            logger.warning(f"Failed to read the SQL file or invalid query: {sql}")
+            return False
+        primary_key = [primary_key] if isinstance(primary_key, str) else primary_key
+        self._materialized[table_name] = (sql, primary_key, params)
+
+        try:
+            select_query = render_query(select_query, params).strip().rstrip(";")
+        except ValueError as e:
+            logger.warning(f"Failed to bind the query parameters: {e}")
+            return False
+        target = quote_identifier(table_name)
+        shadow = quote_identifier(f"{table_name}__squ_new")
+        retired = quote_identifier(f"{table_name}__squ_old")
+        key_clause = ""
+        if primary_key:
+            key_clause = f"(PRIMARY KEY ({', '.join(quote_column(column) for column in primary_key)})) "
+        statements = [
+            f"DROP TABLE IF EXISTS {shadow}",
+            f"CREATE TABLE {shadow} {key_clause}AS {select_query}",
+        ]
+        if self.config.table_exists(table_name):
+            statements += [
+                f"DROP TABLE IF EXISTS {retired}",
+                f"RENAME TABLE {target} TO {retired}, {shadow} TO {target}",
+                f"DROP TABLE {retired}",
+            ]
+        else:
+            statements.append(f"RENAME TABLE {shadow} TO {target}")
+
+        for statement in statements:
+            if self.verbose:
+                logger.info(f"Materializing table with SQL: {statement}")
+            if not self.config.execute_sql(statement, use_sqlalchemy=False):
+                logger.warning(f"Failed to materialize table '{table_name}'.")
+                return False
+        logger.info(f"Table '{table_name}' materialized successfully.") if self.verbose else None
+        return True
+
+    def rmt(self, table_name, sql=None, watermark_column=None, primary_key=None, params=None):
+        """
+        Refresh a materialized summary table.
+
+        Without a watermark_column the table is fully rebuilt and swapped in as in cmt.
+        With one, only rows of the query past the table's current maximum of that column
+        are inserted, replacing rows with the same primary key.
+
+        Args:
+            table_name (str): Name of the materialized table.
+            sql (str, optional): SQL query or file name defining the table. Defaults to the
+                query the table was created with by cmt on this instance.
+            watermark_column (str, optional): Column whose values only grow, for incremental refreshes.
+            primary_key (str or list, optional): Primary key columns. Defaults to those given to cmt.
+            params (dict, optional): Values of the :name bind parameters of the query.
+
+        Returns:
+            bool: True if the table was refreshed successfully, False otherwise.
+        """
+        saved_sql, saved_key, saved_params = self._materialized.get(table_name, (None, None, None))
+        sql = sql or saved_sql
+        primary_key = primary_key or saved_key
+        params = params if params is not None else saved_params
+        if sql is None:
+            logger.warning(f"No query known for materialized table '{table_name}'.")
+            return False
+        if not watermark_column or not self.config.table_exists(table_name):
+            return self.cmt(table_name, sql, primary_key, params)
+
+        select_query = self._get_query(sql)
+        if select_query is None:
+            logger.warning(f"Failed to read the SQL file or invalid query: {sql}")
+            return False
+        target = quote_identifier(table_name)
+        column = quote_column(watermark_column)
+        rows = self.config.fetch_rows(f"SELECT MAX({column}) FROM {target}")
+        if rows is None:
+            return False
+        watermark = rows[0][0]
+        query = select_query.strip().rstrip(";")
+        query_params = dict(params or {})
+        if watermark is not None:
+            operator = ">=" if primary_key else ">"
+            query = f"SELECT * FROM ({query}) AS _squ WHERE {column} {operator} :_squ_watermark"
+            query_params["_squ_watermark"] = watermark
+        try:
+            # Rendered once, so inlined values are never parsed for parameters again.
+            query = render_query(query, query_params)
+        except ValueError as e:
+            logger.warning(f"Failed to bind the query parameters: {e}")
+            return False
+
+        refresh_sql = f"{'REPLACE' if primary_key else 'INSERT'} INTO {target} {query}"
+        if self.verbose:
+            logger.info(f"Refreshing table incrementally with SQL: {refresh_sql}")
+        success = self.config.execute_sql(refresh_sql, use_sqlalchemy=False)
+        if success:
+            logger.info(f"Table '{table_name}' refreshed successfully.") if self.verbose else None
+        else:
+            logger.warning(f"Failed to refresh table '{table_name}'.")
+        return success
+
+    def dmt(self, table_name):
+        """
+        Drop a materialized summary table from the database.
+
+        Args:
+            table_name (str): Name of the table to drop.
+
+        Returns:
+            bool: True if the table was dropped successfully, False otherwise.
+        """
+        drop_table_sql = f"DROP TABLE IF EXISTS {quote_identifier(table_name)}"
+        if self.verbose:
+            logger.info(f"Dropping table with SQL: {drop_table_sql}")
+        success = self.config.execute_sql(drop_table_sql, use_sqlalchemy=False)
+        self._materialized.pop(table_name, None)
+        if success:
+            logger.info(f"Table '{table_name}' deleted successfully.") if self.verbose else None
         else:
-            print(f"Failed to delete view '{view_name}'.") if self.verbose else None
+            logger.warning(f"Failed to delete table '{table_name}'.")
         return success
 
+    def _get_queries(self, sql):
+        """
+        Get the SQL query, or list of queries, from files or direct input.
+
+        Args:
+            sql (str or list): SQL query, file name, or a list of them.
+
+        Returns:
+            str or list: SQL query or list of queries, or None if any could not be read.
+        """
+        if isinstance(sql, (list, tuple)):
+            queries = [self._get_query(item) for item in sql]
+            return None if any(query is None for query in queries) else queries
+        return self._get_query(sql)
+
     def _get_query(self, sql):
         """
         Get the SQL query from a file or direct input.
@@ -218,11 +1701,11 @@ class SQU:
         Returns:
             str: SQL query.
         """
-        if self.config and self.config.sql_dir and (self.config.sql_dir / sql).is_file():
-            query = self.config.read_sql_file(sql)
+        query = self.config.get_sql_file(sql) if self.config and isinstance(sql, str) else None
+        if query is not None:
             if self.verbose:
-                print(f"Using SQL from file: {query}")
+                logger.info(f"Using SQL from file: {query}")
             return query
         if self.verbose:
-            print(f"Using direct SQL: {sql}")
+            logger.info(f"Using direct SQL: {sql}")
         return sql if isinstance(sql, str) else None
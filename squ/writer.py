@@ -0,0 +1,226 @@
+import datetime
+import logging
+import math
+import os
+import tempfile
+import time
+from .config import quote_identifier
+from .instrument import enable_verbose_logging
+from .lazy import quote_column
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_BATCH_ROWS = 50_000
+WRITE_MODES = ('append', 'replace', 'upsert')
+WRITE_METHODS = ('auto', 'infile', 'executemany')
+# MySQL errors raised when the client or the server rejects LOAD DATA LOCAL INFILE.
+LOCAL_INFILE_ERRORS = (1148, 2068, 3948)
+
+
+class BulkWriter:
+    """
+    High-throughput writer of pandas, polars and pyarrow data into MySQL tables.
+
+    Two load paths are available: LOAD DATA LOCAL INFILE from a streamed temporary TSV
+    file, and multi-row INSERT statements built by pymysql's executemany and sized by
+    bytes. Each write runs in a single transaction on a pooled connection.
+
+    Attributes:
+        config (Config): Configuration object owning the engine registry.
+        verbose (bool): Flag to control the verbosity of the output.
+    """
+
+    def __init__(self, config, verbose=False):
+        """
+        Initialize the BulkWriter class.
+
+        Args:
+            config (Config): Configuration object owning the engine registry.
+            verbose (bool): Flag to control the verbosity of the output. Default is False.
+        """
+        self.config = config
+        self.verbose = verbose
+        if verbose:
+            enable_verbose_logging()
+
+    def write(self, data, library, table_name, mode='append', method='auto', batch_bytes=DEFAULT_BATCH_BYTES):
+        """
+        Write a DataFrame or Table into an existing table.
+
+        Args:
+            data (DataFrame): Data to write.
+            library (str): Library of the data ('pandas', 'polars', 'arrow').
+            table_name (str): Destination table.
+            mode (str): 'append' inserts the rows, 'replace' deletes the existing rows first in
+                the same transaction, 'upsert' updates rows whose key already exists
+                (ON DUPLICATE KEY UPDATE). Default is 'append'.
+            method (str): 'infile', 'executemany', or 'auto' to use LOAD DATA LOCAL INFILE when the
+                server's local_infile is on and fall back to executemany otherwise or when the
+                load is rejected, which is remembered for later writes. Default is 'auto'.
+            batch_bytes (int): Maximum size in bytes of each multi-row INSERT statement.
+
+        Returns:
+            dict: Rows written, elapsed seconds, rows per second, method and mode.
+        """
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unsupported write mode: {mode}")
+        if method not in WRITE_METHODS:
+            raise ValueError(f"Unsupported write method: {method}")
+
+        columns = [str(column) for column in (data.columns if library != 'arrow' else data.column_names)]
+        start = time.perf_counter()
+        if method == 'auto' and not self.config.local_infile_enabled():
+            method = 'executemany'
+        if method in ('auto', 'infile'):
+            try:
+                rows = self._write_with_infile(data, library, table_name, columns, mode)
+                method = 'infile'
+            except Exception as e:
+                if method == 'infile':
+                    raise
+                logger.warning(f"LOAD DATA LOCAL INFILE failed, falling back to executemany: {e}")
+                if e.args and e.args[0] in LOCAL_INFILE_ERRORS:
+                    self.config.disable_local_infile()
+                method = 'executemany'
+                start = time.perf_counter()
+        if method == 'executemany':
+            rows = self._write_with_executemany(data, library, table_name, columns, mode, batch_bytes)
+
+        seconds = time.perf_counter() - start
+        stats = {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else float(rows),
+            "method": method,
+            "mode": mode,
+        }
+        if self.verbose:
+            logger.info(f"Wrote {rows} rows into {table_name} with {method} in {seconds:.3f}s "
+                        f"({stats['rows_per_second']:.0f} rows/s)")
+        return stats
+
+    def _write_with_executemany(self, data, library, table_name, columns, mode, batch_bytes):
+        column_list = ", ".join(quote_column(column) for column in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        insert_sql = f"INSERT INTO {quote_identifier(table_name)} ({column_list}) VALUES ({placeholders})"
+        if mode == 'upsert':
+            insert_sql += " ON DUPLICATE KEY UPDATE " + _update_list(columns)
+
+        connection = self.config.get_engine(self.config.create_mysql_uri("pymysql")).raw_connection()
+        rows = 0
+        try:
+            with connection.cursor() as cursor:
+                cursor.max_stmt_length = batch_bytes
+                if mode == 'replace':
+                    cursor.execute(f"DELETE FROM {quote_identifier(table_name)}")
+                for batch in iter_row_batches(data, library):
+                    rows += len(batch)
+                    cursor.executemany(insert_sql, batch)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return rows
+
+    def _write_with_infile(self, data, library, table_name, columns, mode):
+        column_list = ", ".join(quote_column(column) for column in columns)
+        table = quote_identifier(table_name)
+        target = table if mode != 'upsert' else quote_identifier(f"_squ_load_{os.getpid()}")
+        load_sql = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {target} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({column_list})"
+        )
+        path = None
+        try:
+            with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="", delete=False) as file:
+                path = file.name
+                rows = 0
+                for batch in iter_row_batches(data, library):
+                    rows += len(batch)
+                    file.writelines("\t".join(_tsv_field(value) for value in row) + "\n" for row in batch)
+
+            uri = self.config.create_mysql_uri("pymysql") + "?local_infile=1"
+            connection = self.config.get_engine(uri).raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    if mode == 'replace':
+                        cursor.execute(f"DELETE FROM {table}")
+                    if mode == 'upsert':
+                        cursor.execute(f"CREATE TEMPORARY TABLE {target} LIKE {table}")
+                    try:
+                        cursor.execute(load_sql, (path,))
+                        if mode == 'upsert':
+                            cursor.execute(
+                                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {target} "
+                                f"ON DUPLICATE KEY UPDATE {_update_list(columns)}"
+                            )
+                    finally:
+                        if mode == 'upsert':
+                            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {target}")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.close()
+        finally:
+            if path is not None:
+                os.unlink(path)
+        return rows
+
+
+def iter_row_batches(data, library, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Yield the rows of a DataFrame or Table as lists of tuples of Python values.
+
+    Missing values are converted to None so they are written as NULL.
+
+    Args:
+        data (DataFrame): Data to iterate.
+        library (str): Library of the data ('pandas', 'polars', 'arrow').
+        batch_rows (int): Maximum number of rows per batch.
+
+    Yields:
+        list: Batch of row tuples.
+    """
+    for start in range(0, len(data) if library != 'arrow' else data.num_rows, batch_rows):
+        if library == 'pandas':
+            chunk = data.iloc[start:start + batch_rows]
+            values = [chunk[column].astype(object).where(chunk[column].notna(), None).tolist()
+                      for column in chunk.columns]
+            yield list(zip(*values))
+        elif library == 'polars':
+            yield list(data.slice(start, batch_rows).iter_rows())
+        elif library == 'arrow':
+            chunk = data.slice(start, batch_rows)
+            yield list(zip(*[column.to_pylist() for column in chunk.columns]))
+        else:
+            raise ValueError(f"Unsupported library: {library}")
+
+
+def _tsv_field(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+def _update_list(columns):
+    return ", ".join(f"{quote_column(column)} = VALUES({quote_column(column)})" for column in columns)
@@ -0,0 +1,77 @@
+import time
+import pytest
+from squ.cache import ResultCache
+
+@pytest.fixture
+def table():
+    import pyarrow as pa
+    return pa.table({'id': list(range(100)), 'name': [f"name_{i}" for i in range(100)]})
+
+# Test that cache keys ignore whitespace and trailing semicolons
+@pytest.mark.core
+def test_make_key_normalizes_query():
+    key = ResultCache.make_key("SELECT *\n  FROM test_table;", "testuser@localhost:3306/testdb")
+    assert key == ResultCache.make_key("SELECT * FROM test_table", "testuser@localhost:3306/testdb")
+    assert key != ResultCache.make_key("SELECT * FROM test_table", "testuser@replica:3306/testdb")
+    assert key != ResultCache.make_key("SELECT * FROM test_table", "testuser@localhost:3306/testdb", {"id": 1})
+
+# Test that one cached entry serves every library
+@pytest.mark.arrow
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_cache_roundtrip(tmp_path, table, file_format):
+    cache = ResultCache(tmp_path, file_format=file_format)
+    assert cache.get("key") is None
+    cache.put("key", table, 'arrow')
+    path = cache.get("key")
+    assert cache.load(path, 'arrow').equals(table)
+    assert cache.load(path, 'pandas')["id"].tolist() == list(range(100))
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+# Test that expired entries are dropped
+@pytest.mark.arrow
+def test_cache_ttl(tmp_path, table):
+    cache = ResultCache(tmp_path, default_ttl=0.01)
+    cache.put("key", table, 'arrow')
+    time.sleep(0.05)
+    assert cache.get("key") is None
+    assert cache.stats()["entries"] == 0
+
+# Test that the least recently used entry is evicted over the size budget
+@pytest.mark.arrow
+def test_cache_lru_eviction(tmp_path, table):
+    cache = ResultCache(tmp_path)
+    size = cache.put_tables("first", [table]).stat().st_size
+    cache.max_bytes = size * 2
+    cache.put("second", table, 'arrow')
+    cache.get("first")
+    cache.put("third", table, 'arrow')
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.stats()["evictions"] == 1
+
+# Test that the index survives a new cache instance and can be invalidated
+@pytest.mark.arrow
+def test_cache_persistence_and_invalidation(tmp_path, table):
+    ResultCache(tmp_path).put("key", table, 'arrow')
+    cache = ResultCache(tmp_path)
+    assert cache.get("key") is not None
+    assert cache.invalidate("key") is True
+    assert cache.get("key") is None
+
+# Test that caches sharing a directory keep, serve and evict each other's entries
+@pytest.mark.arrow
+def test_cache_shared_directory(tmp_path, table):
+    first, second = ResultCache(tmp_path), ResultCache(tmp_path)
+    size = first.put_tables("first", [table]).stat().st_size
+    second.put("second", table, 'arrow')
+    assert second.get("first") is not None
+    assert ResultCache(tmp_path).stats()["entries"] == 2
+    index_mtime = (tmp_path / ResultCache.INDEX_FILE).stat().st_mtime_ns
+    first.get("second")
+    first.get("missing")
+    assert (tmp_path / ResultCache.INDEX_FILE).stat().st_mtime_ns == index_mtime
+    first.max_bytes = size * 2
+    first.put("third", table, 'arrow')
+    assert first.evictions == 1
+    assert ResultCache(tmp_path).stats()["entries"] == 2
@@ -0,0 +1,78 @@
+import decimal
+import pytest
+from squ.dtypes import (FLAG_ENUM, FLAG_NOT_NULL, FLAG_UNSIGNED, column_kinds, dtype_options, optimize_pandas,
+                        optimize_polars, pandas_dtypes)
+
+FIELDS = [
+    {"name": "id", "type_code": 3, "flags": FLAG_NOT_NULL | FLAG_UNSIGNED, "length": 10, "scale": 0},
+    {"name": "age", "type_code": 1, "flags": 0, "length": 4, "scale": 0},
+    {"name": "price", "type_code": 246, "flags": FLAG_NOT_NULL, "length": 12, "scale": 2},
+    {"name": "status", "type_code": 254, "flags": FLAG_ENUM, "length": 24, "scale": 0},
+    {"name": "country", "type_code": 253, "flags": 0, "length": 64, "scale": 0},
+    {"name": "email", "type_code": 253, "flags": 0, "length": 255, "scale": 0},
+]
+ROWS = {
+    "id": [1, 2, 3, 4],
+    "age": [28, None, 24, 45],
+    "price": [decimal.Decimal("1.50"), decimal.Decimal("2.25"), decimal.Decimal("3.00"), decimal.Decimal("4.75")],
+    "status": ["open", "paid", "open", "open"],
+    "country": ["MX", "MX", "US", "MX"],
+    "email": ["a@example.com", "b@example.com", "c@example.com", "d@example.com"],
+}
+
+# Test that MySQL metadata is classified into column kinds
+@pytest.mark.core
+def test_column_kinds():
+    kinds = column_kinds(FIELDS)
+    assert kinds["id"] == {"kind": "int", "bits": 32, "unsigned": True, "nullable": False}
+    assert kinds["age"]["bits"] == 8 and kinds["age"]["nullable"]
+    assert kinds["price"] == {"kind": "decimal", "precision": 10, "scale": 2, "nullable": False}
+    assert kinds["status"]["kind"] == "enum"
+    assert kinds["email"]["kind"] == "string"
+
+
+# Test that metadata maps to the dtypes read_sql_query infers from values
+@pytest.mark.pandas
+def test_pandas_dtypes():
+    import datetime
+    import pandas as pd
+    dtypes = pandas_dtypes(FIELDS + [{"name": "created", "type_code": 12, "flags": 0, "length": 19, "scale": 0}])
+    string = pd.Series(["a"]).dtype
+    assert dtypes == {"id": "int64", "age": "float64", "price": "float64", "status": string, "country": string,
+                      "email": string, "created": pd.Series([datetime.datetime(2024, 1, 2)]).dtype}
+
+# Test that invalid dtype options are rejected
+@pytest.mark.core
+def test_dtype_options():
+    assert dtype_options(False) is None
+    assert dtype_options(True)["decimal"] == "float64"
+    with pytest.raises(ValueError):
+        dtype_options({"decimal": "int"})
+    with pytest.raises(ValueError):
+        dtype_options({"unknown": 1})
+
+# Test that pandas columns are narrowed from the metadata
+@pytest.mark.pandas
+def test_optimize_pandas():
+    import pandas as pd
+    df = optimize_pandas(pd.DataFrame(ROWS), column_kinds(FIELDS), dtype_options(True))
+    assert str(df["id"].dtype) == "uint32"
+    assert str(df["age"].dtype) == "Int8"
+    assert str(df["price"].dtype) == "float64"
+    assert str(df["status"].dtype) == "category"
+    assert str(df["country"].dtype) == "category"
+    assert str(df["email"].dtype) != "category"
+    assert df["age"].isna().sum() == 1
+
+# Test that polars columns follow the same rules
+@pytest.mark.polars
+def test_optimize_polars():
+    import polars as pl
+    options = dtype_options({"decimal": "decimal"})
+    df = optimize_polars(pl.DataFrame(ROWS), column_kinds(FIELDS), options)
+    assert df.schema["id"] == pl.UInt32
+    assert df.schema["age"] == pl.Int8
+    assert df.schema["price"] == pl.Decimal(10, 2)
+    assert df.schema["status"] == pl.Categorical
+    assert df.schema["country"] == pl.Categorical
+    assert df.schema["email"] == pl.String
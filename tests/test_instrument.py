@@ -0,0 +1,61 @@
+import logging
+import pytest
+from squ.instrument import Instrumentation, annotate, current_trace, phase
+
+# Test that traces record exclusive phase timings and reach the hooks
+@pytest.mark.core
+def test_trace_phases_and_hooks():
+    instrumentation = Instrumentation()
+    events = []
+    instrumentation.add_hook(events.append)
+    with instrumentation.trace("query", "pandas", "SELECT 1") as query_trace:
+        assert current_trace() is query_trace
+        with phase("convert"):
+            with phase("execute"):
+                pass
+        annotate(engine="sqlalchemy", rows=1)
+    assert current_trace() is None
+    assert events[0]["engine"] == "sqlalchemy" and events[0]["rows"] == 1
+    assert set(events[0]["phases"]) == {"convert", "execute"}
+    assert sum(events[0]["phases"].values()) <= events[0]["seconds"]
+
+# Test that failed queries are counted and percentiles are aggregated per library
+@pytest.mark.core
+def test_stats_and_errors():
+    instrumentation = Instrumentation()
+    for _ in range(3):
+        with instrumentation.trace("query", "polars"):
+            pass
+    with pytest.raises(ValueError):
+        with instrumentation.trace("query", "polars"):
+            raise ValueError("boom")
+    stats = instrumentation.stats()["polars"]
+    assert stats["count"] == 4 and stats["errors"] == 1
+    assert stats["p50"] <= stats["p99"] <= stats["max"]
+    instrumentation.reset()
+    assert instrumentation.stats() == {}
+
+# Test that a failing hook is logged without affecting the query
+@pytest.mark.core
+def test_failing_hook(caplog):
+    instrumentation = Instrumentation()
+
+    @instrumentation.add_hook
+    def broken(event):
+        raise RuntimeError("hook failed")
+
+    with caplog.at_level(logging.WARNING, logger="squ"):
+        with instrumentation.trace("command"):
+            pass
+    assert "hook failed" in caplog.text
+    assert instrumentation.remove_hook(broken) is True
+    assert instrumentation.remove_hook(broken) is False
+
+# Test that lazy results, such as spilled polars frames, are not measured
+@pytest.mark.polars
+def test_result_size_of_lazy_results():
+    import polars as pl
+    from squ.instrument import result_size
+    df = pl.DataFrame({"a": [1, 2, 3]})
+    assert result_size(df, 'polars')[0] == 3
+    assert result_size(df.lazy(), 'polars') == (None, None)
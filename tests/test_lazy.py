@@ -0,0 +1,26 @@
+import datetime
+import pytest
+from squ.lazy import predicate_to_sql
+
+# Test that comparisons, null checks and boolean logic are translated exactly
+@pytest.mark.polars
+def test_predicate_to_sql_exact():
+    import polars as pl
+    condition, params, exact = predicate_to_sql(
+        ((pl.col("age") > 30) | pl.col("age").is_null()) & ~(pl.col("created") < datetime.date(2024, 1, 1))
+    )
+    assert condition == "((`age` > :_squ_p0) OR (`age` IS NULL)) AND (NOT (`created` < :_squ_p1))"
+    assert params == {"_squ_p0": 30, "_squ_p1": datetime.date(2024, 1, 1)}
+    assert exact is True
+
+# Test that string equality is pushed as a superset and unsupported parts are skipped
+@pytest.mark.polars
+def test_predicate_to_sql_partial():
+    import polars as pl
+    condition, params, exact = predicate_to_sql(
+        (pl.col("name") == "Doe") & (pl.col("name").str.len_chars() > 2) & (pl.col("name") > "A")
+    )
+    assert condition == "(`name` = :_squ_p0)"
+    assert params == {"_squ_p0": "Doe"}
+    assert exact is False
+    assert predicate_to_sql(~(pl.col("name") == "Doe")) == (None, {}, False)
@@ -0,0 +1,57 @@
+import pytest
+from squ.planner import choose_strategy, estimate_result, resolve_thresholds
+
+THRESHOLDS = resolve_thresholds({"partition_rows": 1000, "rows_per_partition": 100, "max_partitions": 4,
+                                 "stream_bytes": 10_000, "spill_bytes": 1_000_000})
+
+def estimate(rows, row_bytes=10):
+    return {"rows": rows, "row_bytes": row_bytes, "bytes": rows * row_bytes, "tables": []}
+
+# Test that rows come from the outer plan steps and the width from table statistics
+@pytest.mark.core
+def test_estimate_result():
+    explain_rows = [
+        {"id": 1, "table": "orders", "rows": 1000, "filtered": 50.0},
+        {"id": 1, "table": "customers", "rows": 1, "filtered": 100.0},
+        {"id": 2, "table": "items", "rows": 10, "filtered": 100.0},
+    ]
+    statistics = {"orders": {"rows": 1000, "avg_row_length": 60}, "customers": {"rows": 10, "avg_row_length": 40}}
+    assert estimate_result(explain_rows, statistics, 256) == {
+        "rows": 500, "row_bytes": 100, "bytes": 50_000, "tables": ["orders", "customers"],
+    }
+    assert estimate_result(explain_rows, {}, 256)["row_bytes"] == 256
+
+# Test the strategy chosen for each size of result
+@pytest.mark.core
+@pytest.mark.parametrize("library, rows, partition_on, strategy", [
+    ("pandas", 10, None, "single"),
+    ("pandas", 1500, None, "stream"),
+    ("polars", 1500, None, "single"),
+    ("pandas", 5000, "id", "stream"),
+    ("pandas", 5000, None, "stream"),
+    ("arrow", 5000, "id", "partitioned"),
+    ("dask", 5000, None, "partitioned"),
+    ("polars", 200_000, "id", "spill"),
+])
+def test_choose_strategy(library, rows, partition_on, strategy):
+    assert choose_strategy(estimate(rows), library, THRESHOLDS, partition_on)["strategy"] == strategy
+
+# Test that partitioned reads are capped by max_partitions
+@pytest.mark.core
+def test_partition_count():
+    plan = choose_strategy(estimate(5000), "polars", THRESHOLDS, "id")
+    assert plan["options"] == {"partition_on": "id", "partition_num": 4}
+
+# Test that pandas reads are only partitioned or streamed without changing their dtype backend
+@pytest.mark.core
+def test_pandas_dtype_backend_is_kept():
+    plan = choose_strategy(estimate(5000), "pandas", THRESHOLDS, "id", dtype_backend="pyarrow")
+    assert plan["strategy"] == "partitioned" and "dtype_backend" not in plan["options"]
+    assert choose_strategy(estimate(1500), "pandas", THRESHOLDS, dtype_backend="pyarrow")["strategy"] == "single"
+
+# Test that unknown thresholds are rejected
+@pytest.mark.core
+def test_resolve_thresholds():
+    assert resolve_thresholds()["partition_rows"] == 1_000_000
+    with pytest.raises(ValueError):
+        resolve_thresholds({"spill_rows": 1})
@@ -0,0 +1,90 @@
+import pytest
+from squ.replicas import ReplicaSet, parse_hosts
+
+
+def healthy(replica):
+    return 0.0
+
+# Test that round robin spreads reads over every healthy replica
+@pytest.mark.core
+def test_round_robin():
+    replicas = ReplicaSet([("r1", "3306"), ("r2", "3306"), ("r3", "3306")])
+    picked = []
+    for _ in range(6):
+        replica = replicas.acquire(healthy)
+        picked.append(replica.host)
+        replicas.release(replica)
+    assert sorted(picked) == ["r1", "r1", "r2", "r2", "r3", "r3"]
+
+# Test that least connections picks the replica with the fewest reads in flight
+@pytest.mark.core
+def test_least_connections():
+    replicas = ReplicaSet([("r1", "3306"), ("r2", "3306")], balancing="least_connections")
+    first = replicas.acquire(healthy)
+    second = replicas.acquire(healthy)
+    assert first is not second
+    replicas.release(first)
+    assert replicas.acquire(healthy) is first
+
+# Test that lagging and unreachable replicas are skipped until checked healthy again
+@pytest.mark.core
+def test_health_checks_skip_replicas():
+    lags = {"r1": 120.0, "r2": 1.0}
+
+    def probe(replica):
+        if replica.host not in lags:
+            raise ConnectionError("unreachable")
+        return lags[replica.host]
+
+    replicas = ReplicaSet([("r1", "3306"), ("r2", "3306"), ("r3", "3306")], max_lag=10, check_interval=0)
+    assert {replicas.acquire(probe).host for _ in range(4)} == {"r2"}
+    lags["r1"] = 0.0
+    assert {replicas.acquire(probe).host for _ in range(4)} == {"r1", "r2"}
+    assert [status["healthy"] for status in replicas.status()] == [True, True, False]
+
+# Test that failed replicas are excluded and marked down
+@pytest.mark.core
+def test_failover():
+    replicas = ReplicaSet([("r1", "3306"), ("r2", "3306")])
+    first = replicas.acquire(healthy)
+    replicas.mark_down(first)
+    replicas.release(first)
+    second = replicas.acquire(healthy, exclude=[first])
+    assert second is not first
+    assert replicas.acquire(healthy, exclude=[second]) is None
+
+# Test that invalid balancing strategies are rejected
+@pytest.mark.core
+def test_invalid_balancing():
+    with pytest.raises(ValueError):
+        ReplicaSet([("r1", "3306")], balancing="random")
+
+# Test parsing of replica host lists
+@pytest.mark.core
+def test_parse_hosts():
+    assert parse_hosts("r1:3307, r2,,", "3306") == [("r1", "3307"), ("r2", "3306")]
+    assert parse_hosts(None, "3306") == []
+
+# Test that async reads go to a replica and fail over when it goes down mid-read
+@pytest.mark.core
+def test_run_read_async_failover(tmp_path, monkeypatch):
+    import asyncio
+    from squ.config import Config
+    (tmp_path / ".env").write_text("DB_HOST=primary\nDB_PORT=3306\nDB_REPLICA_HOSTS=r1,r2\n")
+    config = Config(tmp_path, tmp_path / ".env")
+    down = set()
+
+    def probe(replica):
+        if replica.host in down:
+            raise ConnectionError(replica.host)
+
+    async def read(host, port):
+        if host == "r1":
+            down.add(host)
+            raise ConnectionError(host)
+        return host
+
+    monkeypatch.setattr(config, "_probe_replica", probe)
+    assert asyncio.run(config.run_read_async(read)) == "r2"
+    assert asyncio.run(config.run_read_async(read)) == "r2"
+    assert [status["healthy"] for status in config.replicas.status()] == [False, True]
@@ -0,0 +1,45 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from squ.singleflight import SingleFlight
+
+# Test that concurrent calls of the same key run the function once
+@pytest.mark.core
+def test_concurrent_calls_are_coalesced():
+    single_flight = SingleFlight()
+    calls = []
+
+    def query():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: single_flight.do("kpis", query), range(6)))
+    assert len(calls) == 1
+    assert all(result == [1, 2, 3] for result, _ in results)
+    assert sum(shared for _, shared in results) == 5 == single_flight.shared
+
+# Test that errors reach every waiting caller and are not kept
+@pytest.mark.core
+def test_errors_are_shared_and_not_cached():
+    single_flight = SingleFlight(window=60)
+
+    def failing():
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        single_flight.do("kpis", failing)
+    assert single_flight.do("kpis", lambda: 1) == (1, False)
+    assert single_flight.do("kpis", lambda: 2) == (1, True)
+
+# Test that pandas results are handed off as independent copies
+@pytest.mark.pandas
+def test_results_are_copied_on_handoff():
+    import pandas as pd
+    single_flight = SingleFlight(window=60)
+    first, _ = single_flight.do("kpis", lambda: pd.DataFrame({"a": [1, 2]}), "pandas")
+    first.loc[0, "a"] = 100
+    second, shared = single_flight.do("kpis", lambda: None, "pandas")
+    assert shared and second["a"].tolist() == [1, 2]
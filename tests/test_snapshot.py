@@ -0,0 +1,33 @@
+import datetime
+import pytest
+from squ.snapshot import Snapshot
+
+# Test that keyed merges replace changed rows and advance the watermark
+@pytest.mark.polars
+def test_snapshot_upsert(tmp_path):
+    import polars as pl
+    snapshot = Snapshot(tmp_path / "orders.parquet", "updated_at", key_columns="id")
+    assert snapshot.load_watermark() is None
+    snapshot.merge(pl.DataFrame({
+        "id": [1, 2],
+        "status": ["open", "open"],
+        "updated_at": [datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)],
+    }))
+    snapshot.merge(pl.DataFrame({
+        "id": [2, 3],
+        "status": ["paid", "open"],
+        "updated_at": [datetime.datetime(2024, 1, 3), datetime.datetime(2024, 1, 4)],
+    }))
+    result = pl.read_parquet(snapshot.path).sort("id")
+    assert result["status"].to_list() == ["open", "paid", "open"]
+    assert Snapshot(snapshot.path, "updated_at").load_watermark() == datetime.datetime(2024, 1, 4)
+
+# Test that merges without keys append rows
+@pytest.mark.polars
+def test_snapshot_append(tmp_path):
+    import polars as pl
+    snapshot = Snapshot(tmp_path / "events.parquet", "id")
+    snapshot.merge(pl.DataFrame({"id": [1, 2]}))
+    snapshot.merge(pl.DataFrame({"id": [3]}))
+    assert pl.read_parquet(snapshot.path)["id"].to_list() == [1, 2, 3]
+    assert snapshot.load_watermark() == 3
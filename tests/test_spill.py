@@ -0,0 +1,64 @@
+import pytest
+from squ.spill import SpillStore
+
+@pytest.fixture
+def reader():
+    import pyarrow as pa
+    table = pa.table({'id': list(range(100)), 'name': [f"name_{i}" for i in range(100)]})
+    return lambda: pa.RecordBatchReader.from_batches(table.schema, table.to_batches(max_chunksize=30))
+
+# Test that spilled results come back lazy or memory-mapped in every library
+@pytest.mark.parametrize("library", [
+    pytest.param("pandas", marks=pytest.mark.arrow),
+    pytest.param("polars", marks=pytest.mark.polars),
+    pytest.param("dask", marks=pytest.mark.dask),
+    pytest.param("arrow", marks=pytest.mark.arrow),
+])
+def test_spill_roundtrip(tmp_path, reader, library):
+    store = SpillStore(tmp_path)
+    result, rows = store.spill(reader(), library)
+    assert rows == 100
+    if library == 'polars':
+        assert result.collect()["id"].to_list() == list(range(100))
+    elif library == 'dask':
+        assert result.compute()["id"].tolist() == list(range(100))
+    elif library == 'arrow':
+        assert result.column("id").to_pylist() == list(range(100))
+    else:
+        assert result["name"].tolist()[-1] == "name_99"
+    assert store.size() > 0
+
+# Test that empty results keep their schema
+@pytest.mark.arrow
+def test_spill_empty_result(tmp_path):
+    import pyarrow as pa
+    schema = pa.schema([('id', pa.int64())])
+    result, rows = SpillStore(tmp_path).spill(pa.RecordBatchReader.from_batches(schema, []), 'arrow')
+    assert rows == 0
+    assert result.schema == schema
+
+# Test that a spilled file is removed once its result is released
+@pytest.mark.parametrize("library", [
+    pytest.param("pandas", marks=pytest.mark.arrow),
+    pytest.param("polars", marks=pytest.mark.polars),
+    pytest.param("arrow", marks=pytest.mark.arrow),
+])
+def test_released_result_removes_file(tmp_path, reader, library):
+    import gc
+    store = SpillStore(tmp_path)
+    result, _ = store.spill(reader(), library)
+    assert store.size() > 0
+    del result
+    gc.collect()
+    assert list(store.directory.iterdir()) == []
+
+# Test that close removes the spilled files
+@pytest.mark.arrow
+def test_close_removes_files(tmp_path, reader):
+    store = SpillStore(tmp_path)
+    result, _ = store.spill(reader(), 'arrow')
+    directory = store.directory
+    assert any(directory.iterdir())
+    store.close()
+    assert not directory.exists()
+    assert store.size() == 0
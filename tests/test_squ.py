@@ -143,3 +143,332 @@ def test_create_view_with_query(squ_instance):
 def test_drop_view2(squ_instance):
     result = squ_instance.dvw("test_view2")
     assert result is True
+
+# Test that repeated queries reuse the same pooled engine
+@pytest.mark.pandas
+def test_engine_is_reused(squ_instance):
+    db_url = squ_instance.config.create_mysql_uri("pymysql")
+    squ_instance.qpd("SELECT 1;")
+    engine = squ_instance.config.get_engine(db_url)
+    squ_instance.qpd("SELECT 1;")
+    assert squ_instance.config.get_engine(db_url) is engine
+
+# Test that closing the instance disposes the pooled engines
+@pytest.mark.pandas
+def test_close_disposes_engines():
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    with SQU(env_path=os.path.join(base_path, ".env"), sql_dir=os.path.join(base_path, "sql"), pool_size=2) as su:
+        result = su.qpd("SELECT 1 AS one;")
+        assert result["one"].tolist() == [1]
+        assert su.config._engines
+    assert not su.config._engines
+
+# Test for qpl with an explicit partition column
+@pytest.mark.polars
+def test_qpl_with_partitions(squ_instance):
+    result = squ_instance.qpl("test_query.sql", partition_on="id", partition_num=3)
+    assert result.height == 10
+    assert sorted(result["id"].to_list()) == list(range(1, 11))
+
+# Test for qpl picking the partition column from the primary key
+@pytest.mark.polars
+def test_qpl_with_detected_partition_column(squ_instance):
+    assert squ_instance._detect_partition_column("SELECT * FROM test_table;") == "id"
+    result = squ_instance.qpl("SELECT * FROM test_table;", partition_num=2)
+    assert result.height == 10
+
+# Test for qar with direct query
+@pytest.mark.arrow
+def test_qar_with_query(squ_instance):
+    result = squ_instance.qar("SELECT * FROM test_table;")
+    assert result.num_rows == 10
+    assert result.column_names[1:] == ['first_name', 'last_name', 'age', 'email']
+
+# Test for qdd split into index column ranges
+@pytest.mark.dask
+def test_qdd_with_partitions(squ_instance):
+    result = squ_instance.qdd("test_query.sql", index_col="id", npartitions=3)
+    assert result.npartitions == 3
+    computed = result.compute()
+    assert sorted(computed["id"].tolist()) == list(range(1, 11))
+
+# Test for qpd_iter yielding bounded chunks
+@pytest.mark.pandas
+def test_qpd_iter_chunks(squ_instance):
+    chunks = list(squ_instance.qpd_iter("test_query.sql", chunksize=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+
+# Test for stopping qpl_iter early and querying again
+@pytest.mark.polars
+def test_qpl_iter_stops_early(squ_instance):
+    chunks = squ_instance.qpl_iter("SELECT * FROM test_table;", chunksize=4)
+    assert next(chunks).height == 4
+    chunks.close()
+    assert squ_instance.qpl("SELECT * FROM test_table;").height == 10
+
+# Test for qpd with Arrow-backed columns
+@pytest.mark.arrow
+def test_qpd_with_pyarrow_backend(squ_instance):
+    import pandas as pd
+    result = squ_instance.qpd("test_query.sql", dtype_backend="pyarrow")
+    assert len(result) == 10
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes)
+
+# Test for qpd with numpy-backed columns read through Arrow
+@pytest.mark.arrow
+def test_qpd_with_numpy_backend(squ_instance):
+    result = squ_instance.qpd("test_query.sql", dtype_backend="numpy")
+    expected = squ_instance.qpd("test_query.sql")
+    assert result["id"].tolist() == expected["id"].tolist()
+
+# Test for qmany with a failing query in the batch
+@pytest.mark.pandas
+def test_qmany_reports_errors(squ_instance):
+    results, errors = squ_instance.qmany(
+        {"file": "test_query.sql", "query": "SELECT * FROM test_table;", "broken": "SELECT * FROM missing_table;"},
+        max_workers=2,
+    )
+    assert len(results["file"]) == 10
+    assert len(results["query"]) == 10
+    assert results["broken"] is None
+    assert list(errors) == ["broken"]
+
+# Test for awaiting several queries concurrently
+@pytest.mark.aio
+def test_async_queries():
+    import asyncio
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    async def run_queries():
+        async with SQU(env_path=os.path.join(base_path, ".env"), sql_dir=os.path.join(base_path, "sql")) as su:
+            return await asyncio.gather(
+                su.aqpd("test_query.sql", timeout=30),
+                su.aqpl("test_query.sql"),
+                su.aqar("SELECT * FROM test_table;"),
+            )
+
+    df_pandas, df_polars, table = asyncio.run(run_queries())
+    assert len(df_pandas) == df_polars.height == table.num_rows == 10
+
+# Test for writing a pandas DataFrame with each mode
+@pytest.mark.pandas
+@pytest.mark.parametrize("method", ["executemany", "auto"])
+def test_wpd_modes(squ_instance, method):
+    import pandas as pd
+    assert squ_instance.config.execute_sql(
+        "CREATE TABLE IF NOT EXISTS test_write (id INT PRIMARY KEY, name VARCHAR(50))"
+    )
+    df = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", None]})
+    stats = squ_instance.wpd(df, "test_write", mode="replace", method=method)
+    assert stats["rows"] == 3
+    squ_instance.wpd(pd.DataFrame({"id": [3, 4], "name": ["c", "d"]}), "test_write", mode="upsert", method=method)
+    result = squ_instance.qpd("SELECT * FROM test_write ORDER BY id;")
+    assert result["name"].tolist() == ["a", "b", "c", "d"]
+    assert squ_instance.config.execute_sql("DROP TABLE test_write")
+
+# Test for bind parameters on the SQLAlchemy and ConnectorX paths
+@pytest.mark.polars
+def test_queries_with_params(squ_instance):
+    query = "SELECT * FROM test_table WHERE age > :min_age AND first_name IN :names;"
+    params = {"min_age": 30, "names": ["Jane", "Bob", "John"]}
+    assert len(squ_instance.qpd(query, params=params)) == 2
+    assert squ_instance.qpl(query, params=params).height == 2
+
+# Test that the SQL file registry re-reads a file only when it changes
+@pytest.mark.core
+def test_sql_file_registry(tmp_path):
+    from squ.config import Config
+    sql_file = tmp_path / "query.sql"
+    sql_file.write_text("SELECT 1;")
+    config = Config(tmp_path, tmp_path / ".env")
+    assert config.get_sql_file("query.sql") == "SELECT 1;"
+    sql_file.write_text("SELECT 2;")
+    os.utime(sql_file, ns=(0, 10**9))
+    assert config.get_sql_file("query.sql") == "SELECT 2;"
+    assert config.get_sql_file("SELECT * FROM test_table;") is None
+
+# Test that bind parameters are inlined as escaped literals
+@pytest.mark.core
+def test_render_query():
+    pytest.importorskip("pymysql")
+    from squ.config import render_query
+    rendered = render_query("SELECT * FROM t WHERE a = :a AND b IN :b AND c = '10:30'", {"a": "x'y", "b": [1, 2]})
+    assert rendered == "SELECT * FROM t WHERE a = 'x\\'y' AND b IN (1,2) AND c = '10:30'"
+
+# Test for refreshing an incremental snapshot
+@pytest.mark.polars
+def test_qpl_incremental(squ_instance, tmp_path):
+    snapshot_path = tmp_path / "test_table.parquet"
+    first = squ_instance.qpl_incremental("test_query.sql", snapshot_path, "id", key_columns="id")
+    assert first.collect().height == 10
+    second = squ_instance.qpl_incremental("test_query.sql", snapshot_path, "id", key_columns="id")
+    assert second.collect().height == 10
+
+# Test for materializing, refreshing and dropping a summary table
+@pytest.mark.view
+def test_materialized_table(squ_instance):
+    query = "SELECT id, first_name, age FROM test_table WHERE age > 30;"
+    assert squ_instance.cmt("test_summary", query, primary_key="id") is True
+    assert squ_instance.rmt("test_summary") is True
+    assert squ_instance.rmt("test_summary", watermark_column="id") is True
+    assert squ_instance.config.fetch_rows("SELECT COUNT(*) FROM test_summary")[0][0] == len(
+        squ_instance.config.fetch_rows(query.rstrip(";"))
+    )
+    assert squ_instance.dmt("test_summary") is True
+    assert squ_instance.config.table_exists("test_summary") is False
+
+# Test for narrowing dtypes from the MySQL column metadata
+@pytest.mark.pandas
+def test_qpd_optimize_dtypes(squ_instance):
+    result = squ_instance.qpd("SELECT first_name, age FROM test_table;", optimize_dtypes={"category_threshold": 1.0})
+    assert str(result["first_name"].dtype) == "category"
+    assert result["age"].dtype.itemsize <= 4
+    assert result["age"].tolist() == squ_instance.qpd("SELECT age FROM test_table;")["age"].tolist()
+
+# Test for pushing polars selections, filters and limits into the SQL query
+@pytest.mark.polars
+def test_qlz_pushdown(squ_instance):
+    import polars as pl
+    lf = squ_instance.qlz("test_query.sql")
+    result = lf.filter(pl.col("age") > 30).select("first_name", "age").sort("age").collect()
+    expected = squ_instance.qpl("test_query.sql").filter(pl.col("age") > 30).select("first_name", "age").sort("age")
+    assert result.equals(expected)
+    assert lf.head(3).collect().height == 3
+
+# Test that spilled results match in-memory ones and are removed on close
+@pytest.mark.polars
+def test_qpl_spill(squ_instance):
+    lf = squ_instance.qpl("test_query.sql", spill=True)
+    assert lf.collect().equals(squ_instance.qpl("test_query.sql"))
+    directory = squ_instance.spill.directory
+    squ_instance.spill.close()
+    assert not directory.exists()
+
+# Test that scripts are split outside of strings, comments and DELIMITER blocks
+@pytest.mark.core
+def test_split_statements():
+    from squ.config import split_statements
+    script = (
+        "CREATE TEMPORARY TABLE t AS SELECT ';' AS a; -- comment;\n"
+        "SELECT `a;b` FROM t /* ; */;\n"
+        "DELIMITER //\nCREATE PROCEDURE p() BEGIN SELECT 1; END //\nDELIMITER ;\n"
+        "# trailing comment\n"
+    )
+    assert split_statements(script) == [
+        "CREATE TEMPORARY TABLE t AS SELECT ';' AS a",
+        "-- comment;\nSELECT `a;b` FROM t /* ; */",
+        "CREATE PROCEDURE p() BEGIN SELECT 1; END",
+    ]
+
+# Test that script statements share one session and return every result set
+@pytest.mark.pandas
+def test_qscript(squ_instance):
+    results = squ_instance.qscript(
+        "CREATE TEMPORARY TABLE adults AS SELECT * FROM test_table WHERE age > :age;"
+        "SET @total := (SELECT COUNT(*) FROM adults);"
+        "SELECT @total AS total; SELECT first_name FROM adults ORDER BY age;",
+        params={"age": 30},
+    )
+    assert len(results) == 2
+    assert int(results[0]["total"][0]) == len(results[1]) == 6
+    assert squ_instance.qscript("SELECT * FROM adults") is None
+
+# Test that the auto mode plans small queries as single reads
+@pytest.mark.pandas
+def test_qpd_auto(squ_instance):
+    plan = squ_instance.plan_query("test_query.sql")
+    assert plan["strategy"] == "single"
+    assert plan["rows"] >= 1
+    result = squ_instance.qpd("test_query.sql", auto=True)
+    assert len(result) == 10
+
+# Test that the auto mode keeps the options set by the caller
+@pytest.mark.core
+def test_auto_options_keep_caller_options(tmp_path, monkeypatch):
+    su = SQU(env_path=str(tmp_path / ".env"), sql_dir=str(tmp_path))
+    plan = {"strategy": "partitioned", "options": {"partition_on": "id", "partition_num": 8, "dtype_backend": "numpy"}}
+    monkeypatch.setattr(su, "plan_query", lambda *args: plan)
+    options = su._auto_options("SELECT 1", 'pandas', {"params": None, "dtype_backend": "pyarrow", "spill": False})
+    assert options == {"params": None, "dtype_backend": "pyarrow", "spill": False, "partition_on": "id",
+                       "partition_num": 8}
+    del plan["options"]["dtype_backend"]
+    options = su._auto_options("SELECT 1", 'polars', {"partition_on": "created", "partition_num": 2})
+    assert options == {"partition_on": "created", "partition_num": 2}
+
+# Test that queries whose result needs every row at once are never partitioned
+@pytest.mark.core
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM orders ORDER BY created_at",
+    "SELECT * FROM orders LIMIT 10",
+    "SELECT status, amount FROM orders GROUP BY status",
+    "SELECT DISTINCT id, status FROM orders",
+    "SELECT COUNT(*) AS id FROM orders",
+    "SELECT id FROM orders UNION SELECT id FROM archived_orders",
+    "SELECT * FROM orders o JOIN customers c ON c.id = o.customer_id",
+])
+def test_detect_partition_column_rejects(tmp_path, monkeypatch, query):
+    su = SQU(env_path=str(tmp_path / ".env"), sql_dir=str(tmp_path))
+    monkeypatch.setattr(su.config, "get_integer_primary_key", lambda table_name: "id")
+    assert su._detect_partition_column("SELECT id, status FROM orders WHERE status = 'open'") == "id"
+    assert su._detect_partition_column(query) is None
+
+# Test that partitions with NULL-only columns are cast to the dask meta
+@pytest.mark.dask
+def test_partitions_match_meta():
+    import dask
+    import dask.dataframe as dd
+    import pandas as pd
+    from squ.squ import _match_meta
+    meta = pd.DataFrame({"id": [1], "name": ["a"]}).iloc[:0]
+    parts = [_match_meta(pd.DataFrame({"id": [None], "name": [None]}), meta),
+             _match_meta(pd.DataFrame({"id": [2], "name": ["b"]}), meta)]
+    assert parts[0]["name"].dtype == meta["name"].dtype and parts[1]["id"].dtype == "int64"
+    result = dd.from_delayed([dask.delayed(part) for part in parts], meta=meta).compute()
+    assert result["name"].tolist()[1] == "b"
+
+# Test that incremental refreshes render the query once, leaving inlined values untouched
+@pytest.mark.core
+def test_rmt_renders_query_once(tmp_path, monkeypatch):
+    pytest.importorskip("pymysql")
+    su = SQU(env_path=str(tmp_path / ".env"), sql_dir=str(tmp_path))
+    executed = []
+    monkeypatch.setattr(su.config, "table_exists", lambda table_name: True)
+    monkeypatch.setattr(su.config, "fetch_rows", lambda sql_query, params=None: [(5,)])
+    monkeypatch.setattr(su.config, "execute_sql", lambda sql, use_sqlalchemy=True: executed.append(sql) or True)
+    assert su.rmt("summary", "SELECT * FROM orders WHERE note = :note", "id", params={"note": "ETA :tbd"})
+    assert executed == ["INSERT INTO `summary` SELECT * FROM (SELECT * FROM orders WHERE note = 'ETA :tbd') "
+                        "AS _squ WHERE `id` > 5"]
+
+# Test that the auto mode plans a query only when the result cache misses
+@pytest.mark.core
+def test_auto_plans_only_on_cache_miss(tmp_path, monkeypatch):
+    su = SQU(env_path=str(tmp_path / ".env"), sql_dir=str(tmp_path), cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(su, "plan_query", lambda *args: pytest.fail("a cache hit was planned"))
+    monkeypatch.setattr(su.cache, "get", lambda key: tmp_path / "cached")
+    monkeypatch.setattr(su.cache, "load", lambda path, library, dtype_backend=None: "cached result")
+    assert su._execute_cached("SELECT 1", 'pandas', auto=True) == "cached result"
+
+# Test that concurrent first calls on one event loop share a single async pool
+@pytest.mark.aio
+def test_async_pool_created_once(tmp_path, monkeypatch):
+    import asyncio
+    import sys
+    import types
+    from squ.config import Config
+    created = []
+
+    async def create_pool(**kwargs):
+        await asyncio.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setitem(sys.modules, "aiomysql", types.SimpleNamespace(create_pool=create_pool))
+    (tmp_path / ".env").write_text("DB_HOST=localhost\nDB_PORT=3306\n")
+    config = Config(tmp_path, tmp_path / ".env")
+
+    async def first_calls():
+        return await asyncio.gather(*(config.get_async_pool() for _ in range(3)))
+
+    pools = asyncio.run(first_calls())
+    assert len(created) == 1
+    assert all(pool is created[0] for pool in pools)
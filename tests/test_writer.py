@@ -0,0 +1,43 @@
+import datetime
+import pytest
+from squ.writer import _tsv_field, iter_row_batches
+
+# Test that TSV fields are escaped for LOAD DATA
+@pytest.mark.core
+def test_tsv_field_escaping():
+    assert _tsv_field(None) == "\\N"
+    assert _tsv_field(float("nan")) == "\\N"
+    assert _tsv_field(True) == "1"
+    assert _tsv_field("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert _tsv_field(datetime.datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02 03:04:05"
+
+# Test that pandas rows are batched with missing values as None
+@pytest.mark.pandas
+def test_iter_row_batches_pandas():
+    import pandas as pd
+    df = pd.DataFrame({"id": [1, 2, 3], "score": [1.5, None, 3.0]})
+    batches = list(iter_row_batches(df, 'pandas', batch_rows=2))
+    assert batches == [[(1, 1.5), (2, None)], [(3, 3.0)]]
+
+# Test that polars rows are batched
+@pytest.mark.polars
+def test_iter_row_batches_polars():
+    import polars as pl
+    df = pl.DataFrame({"id": [1, 2, 3], "name": ["a", None, "c"]})
+    assert list(iter_row_batches(df, 'polars', batch_rows=2)) == [[(1, "a"), (2, None)], [(3, "c")]]
+
+# Test that the temporary TSV is removed when writing it fails
+@pytest.mark.core
+def test_infile_removes_temp_file_on_error(tmp_path, monkeypatch):
+    import tempfile
+    from squ.writer import BulkWriter
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    with pytest.raises(ValueError):
+        BulkWriter(config=None)._write_with_infile([(1,)], 'unknown', 't', ['id'], 'append')
+    assert list(tmp_path.iterdir()) == []
+
+# Test that column names are quoted whole, with backticks escaped
+@pytest.mark.core
+def test_update_list_quotes_columns():
+    from squ.writer import _update_list
+    assert _update_list(["a.b", "c`d"]) == "`a.b` = VALUES(`a.b`), `c``d` = VALUES(`c``d`)"